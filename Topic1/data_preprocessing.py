@@ -3,9 +3,28 @@
 构建所有必要的索引和映射，为后续分析做准备
 """
 import json
+import numbers
 import sys
 from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
+
+# 音乐人对作品的四种角色边
+ROLE_EDGE_TYPES = ('PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf')
+
+# 日期字段优先级：默认顺序与只看发行日期，两种都在建索引时预先解析
+DATE_PRIORITY = ('release_date', 'written_date', 'notoriety_date')
+RELEASE_DATE_ONLY = ('release_date',)
+RESOLVED_DATE_PRIORITIES = (DATE_PRIORITY, RELEASE_DATE_ONLY)
+
+
+def resolve_year(node, priority=DATE_PRIORITY):
+    """按优先级取第一个纯数字日期字段，转为年份；都没有返回 None"""
+    for field in priority:
+        date_str = node.get(field)
+        if date_str and isinstance(date_str, str) and date_str.isdigit():
+            return int(date_str)
+    return None
 
 # 设置输出编码
 if sys.platform == 'win32':
@@ -16,50 +35,533 @@ if sys.platform == 'win32':
 class MusicGraphProcessor:
     """音乐图谱数据处理器"""
     
-    def __init__(self, json_file):
-        """初始化，加载数据"""
-        print("正在加载JSON数据...")
-        with open(json_file, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+    BACKENDS = ('dict', 'csr')
+    
+    def __init__(self, json_file, backend='dict', snapshot=None, streaming=False):
+        """初始化，加载数据
+        backend: 'dict' 使用字典+元组列表索引；'csr' 使用NumPy压缩稀疏行数组（省内存）
+        snapshot: 索引快照目录；True 表示使用默认目录（图文件旁的 *.snapshot/）。
+                  启用后固定使用 'csr' 后端：快照有效时直接 mmap 加载，源文件变化时自动重建
+        streaming: 流式加载，逐条解析 nodes/links 直接送入索引构建，不保留原始文档（无 self.data）
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"未知的索引后端: {backend}，可选 {self.BACKENDS}")
+        self._init_state(json_file, backend)
+        
+        snapshot_dir = None
+        if snapshot:
+            from graph_snapshot import default_snapshot_dir, snapshot_is_fresh
+            snapshot_dir = default_snapshot_dir(json_file) if snapshot is True else snapshot
+            self.backend = 'csr'
+            if snapshot_is_fresh(snapshot_dir, json_file):
+                self._load_snapshot(snapshot_dir)
+                return
+        
+        if streaming:
+            from graph_stream import iter_graph_items
+            
+            print("正在流式加载JSON数据并构建索引...")
+            self._build_indices(iter_graph_items(json_file))
+        else:
+            print("正在加载JSON数据...")
+            with open(json_file, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+            
+            print("数据加载完成！")
+            self._build_indices(self._iter_data_items())
+        
+        if snapshot_dir is not None:
+            try:
+                self.save_snapshot(snapshot_dir)
+            except OSError as exc:
+                print(f"[WARN] 写入索引快照失败: {exc}")
+    
+    def _init_state(self, json_file, backend):
+        self.json_file = str(json_file) if json_file is not None else None
+        self.backend = backend
+        self.csr = None
+        self.snapshot_dir = None  # 当前索引与之完全一致的快照目录（增量更新后清空）
+        self._shared_tmp = None   # publish_shared() 创建的临时目录
+        self._columns = None
+        self._resolved_years = None
+        self._person_work_index = None
+        self._album_song_index = None
+        self._influence_table = None
+        self._co_credit = None
+        self._timeline_cube = None
+        self._dict_csr = None
+    
+    @classmethod
+    def attach(cls, snapshot_dir, json_file=None):
+        """直接 mmap 打开已有快照（不检查源文件），供多进程工作者共享同一份只读索引"""
+        processor = cls.__new__(cls)
+        processor._init_state(json_file, 'csr')
+        processor._load_snapshot(snapshot_dir)
+        return processor
+    
+    def publish_shared(self, shared_dir=None):
+        """把当前索引发布为可供 attach() 共享的快照目录，返回目录路径
+        已从有效快照加载（或刚写入快照）且未做增量更新时直接复用该目录；
+        否则写入 shared_dir，缺省写入本处理器独有的临时目录（再次发布时复用，
+        增量更新后重新发布、close() 或处理器被回收时删除）。仅支持 'csr' 后端
+        """
+        if self.snapshot_dir is not None and shared_dir is None:
+            return self.snapshot_dir
+        if shared_dir is None:
+            import tempfile
+            self.close()
+            self._shared_tmp = tempfile.TemporaryDirectory(prefix='music_graph_')
+            shared_dir = Path(self._shared_tmp.name) / 'snapshot'
+        return self.save_snapshot(shared_dir)
+    
+    def close(self):
+        """删除 publish_shared() 创建的临时快照目录（须在使用它的进程池结束之后调用）"""
+        if self._shared_tmp is None:
+            return
+        if self.snapshot_dir is not None and Path(self._shared_tmp.name) in Path(self.snapshot_dir).parents:
+            self.snapshot_dir = None
+        self._shared_tmp.cleanup()
+        self._shared_tmp = None
+    
+    @classmethod
+    def from_data(cls, data, backend='dict'):
+        """由内存中的图文档（与 Topic1_graph.json 同格式）直接构造处理器"""
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"未知的索引后端: {backend}，可选 {cls.BACKENDS}")
+        processor = cls.__new__(cls)
+        processor._init_state(None, backend)
+        processor.data = data
+        processor._build_indices(processor._iter_data_items())
+        return processor
+    
+    def slice(self, genres=None, years=None, node_types=None, include_neighbors=0,
+              year_field='release_date', backend=None):
+        """切出子图并构造独立的子处理器（graph_slice.py）
+        genres / node_types: 单个值或集合；years: (起始年, 结束年) 闭区间，按 year_field 筛选；
+        满足全部条件的节点为种子，include_neighbors=k 时再纳入 k 跳内（不分方向）的邻居，
+        子图包含这些节点及它们之间的全部边。backend 缺省与当前处理器相同
+        """
+        from graph_slice import slice_document, slice_ordinals
         
-        print("数据加载完成！")
-        self._build_indices()
+        ordinals = slice_ordinals(self, genres, years, node_types, include_neighbors, year_field)
+        return MusicGraphProcessor.from_data(slice_document(self, ordinals),
+                                             backend=backend or self.backend)
     
-    def _build_indices(self):
-        """构建所有索引"""
+    def export_graph(self, path):
+        """把当前图写成与 Topic1_graph.json 同格式的紧凑图文件，返回路径"""
+        from graph_slice import slice_document, write_document
+        
+        document = getattr(self, 'data', None)
+        if document is None:
+            document = slice_document(self)
+        return write_document(document, path)
+    
+    def _iter_data_items(self):
+        """把已加载的文档转换为与流式加载相同的 (section, item) 序列"""
+        for node in self.data['nodes']:
+            yield 'nodes', node
+        for edge in self.data['links']:
+            yield 'links', edge
+    
+    def _build_indices(self, items):
+        """构建所有索引
+        items: (section, item) 序列，section 为 'nodes' 或 'links'，逐条送入索引
+        """
         print("\n正在构建索引...")
         
         # 节点索引
         self.nodes_by_id = {}
         self.nodes_by_type = defaultdict(list)
+        self.edge_count = 0
+        # 预解析年份：priority -> {node_id: year}
+        self._resolved_years = {priority: {} for priority in RESOLVED_DATE_PRIORITIES}
         
-        # 边索引
-        self.edges_by_source = defaultdict(list)  # source -> [(edge_type, target)]
-        self.edges_by_target = defaultdict(list)  # target -> [(edge_type, source)]
-        self.edges_by_type = defaultdict(list)    # edge_type -> [(source, target)]
+        if self.backend == 'csr':
+            from graph_csr import CSRBuilder
+            builder = CSRBuilder()
+            index_edge = builder.add_edge
+        else:
+            builder = None
+            # 边索引
+            self.edges_by_source = defaultdict(list)  # source -> [(edge_type, target)]
+            self.edges_by_target = defaultdict(list)  # target -> [(edge_type, source)]
+            self.edges_by_type = defaultdict(list)    # edge_type -> [(source, target)]
+            # (节点, 边类型) -> 该节点边列表中此类型边的位置，按类型取边时只访问匹配的边
+            self.edges_by_source_type = defaultdict(list)  # (source, edge_type) -> [pos]
+            self.edges_by_target_type = defaultdict(list)  # (target, edge_type) -> [pos]
+            index_edge = self._index_dict_edge
         
-        # 构建节点索引
-        for node in self.data['nodes']:
-            node_id = node['id']
-            node_type = node.get('Node Type')
-            
-            self.nodes_by_id[node_id] = node
-            self.nodes_by_type[node_type].append(node)
+        for section, item in items:
+            if section == 'nodes':
+                # 构建节点索引
+                node_id = item['id']
+                if builder is not None and node_id not in self.nodes_by_id:
+                    builder.add_node(node_id)
+                self._index_node(item)
+            else:
+                # 构建边索引
+                index_edge(item['source'], item['target'], item['Edge Type'])
+                self.edge_count += 1
         
-        # 构建边索引
-        for edge in self.data['links']:
-            source = edge['source']
-            target = edge['target']
-            edge_type = edge['Edge Type']
-            
-            self.edges_by_source[source].append((edge_type, target))
-            self.edges_by_target[target].append((edge_type, source))
-            self.edges_by_type[edge_type].append((source, target))
+        if builder is not None:
+            self.csr = builder.build()
         
+        self._print_index_summary()
+    
+    def _print_index_summary(self):
         print(f"  节点总数: {len(self.nodes_by_id)}")
-        print(f"  边总数: {len(self.data['links'])}")
+        print(f"  边总数: {self.edge_count}")
         print(f"  节点类型: {list(self.nodes_by_type.keys())}")
-        print(f"  边类型: {list(self.edges_by_type.keys())}")
+        print(f"  边类型: {self.get_edge_types()}")
+    
+    def _index_node(self, item, append=True):
+        """节点ID/类型索引与预解析年份；append=False 表示类型索引中已就位"""
+        node_id = item['id']
+        self.nodes_by_id[node_id] = item
+        if append:
+            self.nodes_by_type[item.get('Node Type')].append(item)
+        for priority, years in self._resolved_years.items():
+            year = resolve_year(item, priority)
+            if year is not None:
+                years[node_id] = year
+            else:
+                years.pop(node_id, None)
+    
+    def _unindex_node(self, node_id):
+        """从节点索引中移除，返回被移除的节点（不存在返回 None）"""
+        node = self.nodes_by_id.pop(node_id, None)
+        if node is None:
+            return None
+        node_type = node.get('Node Type')
+        remaining = [n for n in self.nodes_by_type[node_type] if n['id'] != node_id]
+        if remaining:
+            self.nodes_by_type[node_type] = remaining
+        else:
+            del self.nodes_by_type[node_type]
+        for years in self._resolved_years.values():
+            years.pop(node_id, None)
+        return node
+    
+    def _index_dict_edge(self, source, target, edge_type):
+        """字典后端：source/target/type -> 元组列表"""
+        out_edges = self.edges_by_source[source]
+        in_edges = self.edges_by_target[target]
+        self.edges_by_source_type[(source, edge_type)].append(len(out_edges))
+        self.edges_by_target_type[(target, edge_type)].append(len(in_edges))
+        out_edges.append((edge_type, target))
+        in_edges.append((edge_type, source))
+        self.edges_by_type[edge_type].append((source, target))
+    
+    def _remove_dict_edge(self, source, target, edge_type):
+        """字典后端：删除一条匹配的边（最早的一条），不存在返回 False"""
+        out_edges = self.edges_by_source.get(source)
+        if not out_edges or (edge_type, target) not in out_edges:
+            return False
+        out_edges.remove((edge_type, target))
+        self.edges_by_target[target].remove((edge_type, source))
+        self.edges_by_type[edge_type].remove((source, target))
+        self._reindex_dict_positions(self.edges_by_source_type, source, out_edges, edge_type)
+        self._reindex_dict_positions(self.edges_by_target_type, target,
+                                     self.edges_by_target[target], edge_type)
+        return True
+    
+    @staticmethod
+    def _reindex_dict_positions(typed, node_id, edges, removed_type):
+        """删除边后列表位置前移，重建该节点的 (节点, 边类型) -> 位置 索引"""
+        for edge_type in {t for t, _ in edges} | {removed_type}:
+            typed.pop((node_id, edge_type), None)
+        for pos, (edge_type, _) in enumerate(edges):
+            typed[(node_id, edge_type)].append(pos)
+    
+    def apply_delta(self, nodes_added=(), nodes_removed=(), links_added=(), links_removed=()):
+        """增量更新图，原地维护节点/边索引
+        nodes_added: 节点字典（ID已存在时整体替换）；nodes_removed: 节点ID，其关联边一并删除；
+        links_added / links_removed: 与图文件 links 相同格式的字典（source / target / Edge Type），
+        每条删除只删一条匹配的边（按原始顺序最早的一条），新增的边追加在末尾。
+        处理顺序：删除边 -> 删除节点 -> 新增节点 -> 新增边。
+        返回受影响的节点ID集合：增删改的节点及所有增删边的两端；
+        节点类型改变时视同其关联边全部改动，边的另一端也计入。
+        派生索引（列式属性、关联索引、专辑分桶）在下次访问时重建。
+        """
+        changed = set()
+        if self.csr is not None:
+            self._materialize_nodes()
+            removed_eids = set()
+            
+            def remove_edge(source, target, edge_type):
+                for eid in self.csr.find_eids(source, target, edge_type):
+                    if eid not in removed_eids:
+                        removed_eids.add(eid)
+                        changed.update((source, target))
+                        return True
+                return False
+            
+            for link in links_removed:
+                remove_edge(link['source'], link['target'], link['Edge Type'])
+            for node_id in nodes_removed:
+                for eid in self.csr.incident_eids(node_id):
+                    removed_eids.add(eid)
+                changed.update(t for _, t in self.csr.edges_from(node_id))
+                changed.update(s for _, s in self.csr.edges_to(node_id))
+            removed_count = len(removed_eids)
+        else:
+            removed_count = 0
+            for link in links_removed:
+                source, target = link['source'], link['target']
+                if self._remove_dict_edge(source, target, link['Edge Type']):
+                    changed.update((source, target))
+                    removed_count += 1
+            for node_id in nodes_removed:
+                for edge_type, target in list(self.edges_by_source.get(node_id, ())):
+                    removed_count += self._remove_dict_edge(node_id, target, edge_type)
+                    changed.add(target)
+                for edge_type, source in list(self.edges_by_target.get(node_id, ())):
+                    removed_count += self._remove_dict_edge(source, node_id, edge_type)
+                    changed.add(source)
+        
+        for node_id in nodes_removed:
+            self._unindex_node(node_id)
+            changed.add(node_id)
+        for node in nodes_added:
+            node_id = node['id']
+            existing = self.nodes_by_id.get(node_id)
+            in_place = existing is not None and existing.get('Node Type') == node.get('Node Type')
+            if in_place:
+                # 同类型替换：保持节点在各索引中的位置
+                same_type = self.nodes_by_type[node.get('Node Type')]
+                same_type[:] = [node if n['id'] == node_id else n for n in same_type]
+            else:
+                if existing is not None:
+                    # 类型改变（如 Person 改为乐队）时其全部关联边的含义随之改变，
+                    # 边的另一端（作品及其上的合作者）须一并重算；此时边索引仍为更新前的
+                    changed.update(t for _, t in self.get_edges_from(node_id))
+                    changed.update(s for _, s in self.get_edges_to(node_id))
+                self._unindex_node(node_id)
+            self._index_node(node, append=not in_place)
+            changed.add(node_id)
+        
+        added_edges = [(link['source'], link['target'], link['Edge Type']) for link in links_added]
+        if self.csr is not None:
+            self.csr = self.csr.with_delta(list(self.nodes_by_id), removed_eids, added_edges)
+        else:
+            for source, target, edge_type in added_edges:
+                self._index_dict_edge(source, target, edge_type)
+        for source, target, _ in added_edges:
+            changed.update((source, target))
+        self.edge_count += len(added_edges) - removed_count
+        
+        self.snapshot_dir = None
+        self.json_file = None  # 索引已与图文件不一致，不再以其指纹读写缓存
+        self._columns = None
+        self._person_work_index = None
+        self._album_song_index = None
+        self._influence_table = None
+        self._co_credit = None
+        self._timeline_cube = None
+        self._dict_csr = None
+        # 原始文档已与索引不一致，不再保留
+        if hasattr(self, 'data'):
+            del self.data
+        return changed
+    
+    def _materialize_nodes(self):
+        """快照加载时节点为只读映射，增量更新前转为普通字典"""
+        if isinstance(self.nodes_by_id, dict):
+            return
+        # 年份表由旧的列式存储生成，需在列失效之前完成
+        self._year_index(DATE_PRIORITY)
+        self.nodes_by_id = dict(self.nodes_by_id.items())
+        self.nodes_by_type = defaultdict(list)
+        for node in self.nodes_by_id.values():
+            self.nodes_by_type[node.get('Node Type')].append(node)
+    
+    def save_snapshot(self, snapshot_dir):
+        """把CSR索引、节点属性列和节点数据写成快照目录（键为源文件指纹）"""
+        from graph_snapshot import encode_nodes, save_snapshot
+        
+        if self.csr is None:
+            raise RuntimeError("快照需要 backend='csr'")
+        blob, offsets = encode_nodes(self.nodes_by_id.values())
+        
+        arrays = dict(self.csr.arrays())
+        arrays.update({f'col_{name}': arr for name, arr in self.columns.arrays().items()})
+        arrays.update({
+            'node_ids': self.csr.node_ids,
+            'node_blob': blob,
+            'node_offsets': offsets,
+        })
+        arrays.update({f'pw_{name}': arr for name, arr in self.person_work_index.arrays().items()})
+        # 派生表一并写入，attach 的工作进程直接 mmap，不再各自重建
+        arrays.update({f'inf_{name}': arr for name, arr in self.influence_table.arrays().items()})
+        arrays.update({f'cc_{name}': arr for name, arr in self.co_credit.arrays().items()})
+        meta = {
+            'edge_count': self.edge_count,
+            'edge_types': self.csr.edge_type_names,
+            'columns': self.columns.meta(),
+            'role_names': self.person_work_index.role_names,
+            'influence_edge_types': self.influence_table.edge_types,
+        }
+        path = save_snapshot(snapshot_dir, self.json_file, arrays, meta)
+        self.snapshot_dir = path
+        print(f"  索引快照已写入: {path}")
+        return path
+    
+    def _load_snapshot(self, snapshot_dir):
+        """从快照目录 mmap 加载索引，节点字典按需解码"""
+        from graph_cocredit import CoCreditMatrix
+        from graph_columns import NodeColumns
+        from graph_csr import CSRGraph
+        from graph_incidence import PersonWorkIndex
+        from graph_influence import InfluenceTable
+        from graph_snapshot import NodeStore, NodeTypeIndex, load_snapshot
+        
+        print(f"正在从索引快照加载: {snapshot_dir}")
+        arrays, meta = load_snapshot(snapshot_dir)
+        self.csr = CSRGraph(arrays['node_ids'], meta['edge_types'], arrays)
+        column_arrays = {name: arrays[f'col_{name}'] for name in NodeColumns.ARRAY_NAMES}
+        self._columns = NodeColumns(self.csr.node_ids, arrays=column_arrays,
+                                    ordinal_of=self.csr.ordinal_of, **meta['columns'])
+        node_ids = arrays['node_ids'].tolist()
+        self.nodes_by_id = NodeStore(node_ids, self.csr.ordinal_of,
+                                     arrays['node_blob'], arrays['node_offsets'])
+        self.nodes_by_type = NodeTypeIndex(self.nodes_by_id, self._columns.node_type_names,
+                                           self._columns.node_type)
+        self._person_work_index = PersonWorkIndex(
+            meta['role_names'], {name: arrays[f'pw_{name}'] for name in PersonWorkIndex.ARRAY_NAMES})
+        self._influence_table = InfluenceTable(
+            meta['influence_edge_types'],
+            {name: arrays[f'inf_{name}'] for name in InfluenceTable.ARRAY_NAMES})
+        pw = self._person_work_index
+        self._co_credit = CoCreditMatrix(pw.person_ids, pw.person_ordinal_of,
+                                         *(arrays[f'cc_{name}'] for name in CoCreditMatrix.ARRAY_NAMES))
+        self.edge_count = meta['edge_count']
+        self.snapshot_dir = Path(snapshot_dir)
+        self._print_index_summary()
+    
+    @property
+    def columns(self):
+        """列式节点属性存储（graph_columns.NodeColumns），首次访问时一次遍历构建
+        行号为稠密节点序号：CSR后端与 self.csr 的序号一致，字典后端按节点加载顺序
+        """
+        if self._columns is None:
+            from graph_columns import NodeColumns
+            
+            if self.csr is not None:
+                node_ids, ordinal_of = self.csr.node_ids, self.csr.ordinal_of
+            else:
+                node_ids, ordinal_of = list(self.nodes_by_id), None
+            self._columns = NodeColumns.build(node_ids, self.nodes_by_id.get,
+                                              self.get_edge_types(), ordinal_of=ordinal_of)
+        return self._columns
+    
+    @property
+    def person_work_index(self):
+        """音乐人 × 作品 关联索引（graph_incidence.PersonWorkIndex），首次访问时构建
+        每对 (来源, 作品) 存4位角色掩码，并带反向的 作品 -> Person 索引
+        """
+        if self._person_work_index is None:
+            from graph_incidence import PersonWorkIndex
+            
+            self._person_work_index = PersonWorkIndex.build(self, ROLE_EDGE_TYPES)
+        return self._person_work_index
+    
+    @property
+    def album_song_index(self):
+        """(来源, 流派, 年份) 分桶的歌曲索引（graph_incidence.AlbumSongIndex），首次访问时构建"""
+        if self._album_song_index is None:
+            from graph_incidence import AlbumSongIndex
+            
+            self._album_song_index = AlbumSongIndex.build(
+                self, ROLE_EDGE_TYPES, self.person_work_index.person_ids.tolist())
+        return self._album_song_index
+    
+    @property
+    def co_credit(self):
+        """Person 之间的共同署名矩阵（graph_cocredit.CoCreditMatrix），首次访问时构建
+        B·Bᵀ 去掉对角线，B 为 来源 × 作品 关联矩阵；co_credit.count_of(person_id) 即合作者数
+        """
+        if self._co_credit is None:
+            from graph_cocredit import CoCreditMatrix
+            
+            self._co_credit = CoCreditMatrix.build(self.person_work_index)
+        return self._co_credit
+    
+    @property
+    def timeline_cube(self):
+        """流派 × 年份 × (total, notable, songs, albums) 的时间线立方体（graph_timeline.GenreTimelineCube），
+        按发行年份一次扫描全部 Song / Album 构建；任务2 各流派的时间线都是其切片
+        """
+        if self._timeline_cube is None:
+            from graph_timeline import GenreTimelineCube
+            
+            self._timeline_cube = GenreTimelineCube.build(self, RELEASE_DATE_ONLY)
+        return self._timeline_cube
+    
+    @property
+    def influence_table(self):
+        """作品 × 影响类型 的入边计数表（graph_influence.InfluenceTable），首次访问时构建
+        有图文件时按文件指纹缓存在 *.influence/ 目录；各权重方案用 table.scores(weights) 一次求出
+        """
+        if self._influence_table is None:
+            from graph_influence import InfluenceTable
+            
+            self._influence_table = InfluenceTable.load_or_build(self)
+        return self._influence_table
+    
+    def query(self, *steps, distinct=False):
+        """路径模式查询（graph_query.PathQuery）
+        steps 为交替的 Node / Edge 步，例如
+            processor.query(Node('Person'), Edge(ROLE_EDGE_TYPES), Node('Song', notable=True)).run()
+        """
+        from graph_query import PathQuery
+        
+        return PathQuery(self._query_graph(), self.columns, self.get_node, steps, distinct=distinct)
+    
+    def ego_subgraph(self, node_ids, hops=1, edge_types=None, max_nodes=None, direction='both'):
+        """以 node_ids（单个ID或ID列表）为种子的 k 跳自我中心子图（graph_ego.EgoSubgraph）
+        edge_types 限定遍历与诱导边的类型；direction 为 'out' / 'in' / 'both'；
+        max_nodes 限制节点总数（种子总是保留，超出时按发现顺序截断）
+        """
+        return self.ego_subgraphs([node_ids], hops, edge_types, max_nodes, direction)[0]
+    
+    def ego_subgraphs(self, centers, hops=1, edge_types=None, max_nodes=None, direction='both'):
+        """批量模式：每个中心（单个ID或ID列表）一个子图，全部中心在一次向量化扫描中完成
+        返回 graph_ego.EgoBatch，batch[i] 为第 i 个中心的子图
+        """
+        from graph_ego import ego_sweep
+        
+        graph = self._query_graph()
+        ordinal_of = graph.ordinal_of
+        seed_groups = []
+        for center in centers:
+            # 单个ID（含 NumPy 整数，如取自数组接口的ID）或ID列表
+            ids = [center] if isinstance(center, numbers.Integral) else center
+            seed_groups.append([ordinal_of[i] for i in ids if i in ordinal_of])
+        return ego_sweep(graph, seed_groups, hops, edge_types, direction, max_nodes)
+    
+    def _query_graph(self):
+        """查询用的CSR邻接；字典后端按 edges_by_source 的顺序临时构建一份并缓存
+        （字典后端不记录全局边顺序，此时各节点入边的相对顺序按源节点分组）
+        """
+        if self.csr is not None:
+            return self.csr
+        if self._dict_csr is None:
+            from graph_csr import CSRBuilder
+            
+            builder = CSRBuilder()
+            for node_id in self.nodes_by_id:
+                builder.add_node(node_id)
+            for source, edges in self.edges_by_source.items():
+                for edge_type, target in edges:
+                    builder.add_edge(source, target, edge_type)
+            self._dict_csr = builder.build()
+        return self._dict_csr
+    
+    def get_edge_types(self):
+        """获取图中出现过的所有边类型（按首次出现顺序）"""
+        if self.backend == 'csr':
+            return list(self.csr.edge_type_names)
+        return list(self.edges_by_type.keys())
     
     def get_node(self, node_id):
         """根据ID获取节点"""
@@ -69,35 +571,146 @@ class MusicGraphProcessor:
         """根据类型获取所有节点"""
         return self.nodes_by_type.get(node_type, [])
     
-    def get_edges_from(self, source_id):
-        """获取从某个节点出发的所有边"""
-        return self.edges_by_source.get(source_id, [])
+    def get_edges_from(self, source_id, types=None):
+        """获取从某个节点出发的所有边
+        types: 只取这些类型的边（类型名或其集合），结果仍按原始边顺序
+        """
+        if self.backend == 'csr':
+            return self.csr.edges_from(source_id, types)
+        if types is None:
+            return self.edges_by_source.get(source_id, [])
+        return self._typed_dict_edges(self.edges_by_source, self.edges_by_source_type, source_id, types)
     
-    def get_edges_to(self, target_id):
-        """获取指向某个节点的所有边"""
-        return self.edges_by_target.get(target_id, [])
+    def get_edges_to(self, target_id, types=None):
+        """获取指向某个节点的所有边
+        types: 只取这些类型的边（类型名或其集合），结果仍按原始边顺序
+        """
+        if self.backend == 'csr':
+            return self.csr.edges_to(target_id, types)
+        if types is None:
+            return self.edges_by_target.get(target_id, [])
+        return self._typed_dict_edges(self.edges_by_target, self.edges_by_target_type, target_id, types)
+    
+    def _typed_dict_edges(self, edges_by_node, positions_by_key, node_id, types):
+        if isinstance(types, str):
+            types = (types,)
+        hits = [positions_by_key[key] for key in ((node_id, t) for t in set(types))
+                if key in positions_by_key]
+        if not hits:
+            return []
+        edges = edges_by_node[node_id]
+        positions = hits[0] if len(hits) == 1 else sorted(p for pos in hits for p in pos)
+        return [edges[i] for i in positions]
+    
+    def get_degree(self, node_id, types, direction='in'):
+        """按边类型统计度数（O(1)/类型）
+        types: 类型名或其集合；direction: 'in' 入度 / 'out' 出度
+        """
+        if isinstance(types, str):
+            types = (types,)
+        if self.backend == 'csr':
+            ordinal = self.csr.ordinal_of.get(node_id)
+            if ordinal is None:
+                return 0
+            return self.csr.degree(ordinal, self.csr.type_codes(types), direction)
+        if direction not in ('in', 'out'):
+            raise ValueError(f"direction 只能是 'out' 或 'in': {direction}")
+        positions_by_key = self.edges_by_target_type if direction == 'in' else self.edges_by_source_type
+        total = 0
+        for t in set(types):
+            positions = positions_by_key.get((node_id, t))
+            if positions:
+                total += len(positions)
+        return total
+    
+    def get_degree_table(self, direction='in'):
+        """节点 × 边类型 的度数表
+        返回 (node_ids, edge_types, counts)：counts[i][j] 为 node_ids[i] 的 edge_types[j] 类型度数。
+        CSR后端返回 NumPy 数组（零拷贝计算），字典后端返回嵌套列表
+        """
+        edge_types = self.get_edge_types()
+        if self.backend == 'csr':
+            table = self.csr.degree_table(direction)[:, :len(edge_types)]
+            return self.csr.node_ids, edge_types, table
+        node_ids = list(self.nodes_by_id)
+        counts = [[self.get_degree(node_id, t, direction) for t in edge_types] for node_id in node_ids]
+        return node_ids, edge_types, counts
     
     def get_edges_by_type(self, edge_type):
         """获取特定类型的所有边"""
+        if self.backend == 'csr':
+            return self.csr.edges_by_type(edge_type)
         return self.edges_by_type.get(edge_type, [])
     
+    def get_edges_from_array(self, source_id):
+        """零拷贝获取出边：返回 (邻居序号数组, 边类型编码数组) 两个切片视图
+        仅CSR后端可用；序号 -> ID 用 self.csr.node_ids，编码 -> 类型名用 self.csr.edge_type_names。
+        切片内按边类型分组（同类型内保持原始顺序）
+        """
+        return self._csr_slice(source_id, self.csr.out_slice if self.csr else None)
+    
+    def get_edges_to_array(self, target_id):
+        """零拷贝获取入边：返回 (邻居序号数组, 边类型编码数组) 两个切片视图"""
+        return self._csr_slice(target_id, self.csr.in_slice if self.csr else None)
+    
+    def _csr_slice(self, node_id, slicer):
+        if slicer is None:
+            raise RuntimeError("数组接口需要 backend='csr'")
+        ordinal = self.csr.ordinal_of.get(node_id)
+        if ordinal is None:
+            return self.csr.out_neighbors[:0], self.csr.out_types[:0]
+        return slicer(ordinal)
+    
     def extract_date(self, node, priority=['release_date', 'written_date', 'notoriety_date']):
-        """提取节点日期，按优先级"""
-        for field in priority:
-            date_str = node.get(field)
-            if date_str and isinstance(date_str, str) and date_str.isdigit():
-                return int(date_str)
-        return None
+        """提取节点日期，按优先级
+        图中节点在两种常用优先级下直接查预解析结果，其他情况现场解析
+        """
+        years = self._year_index(tuple(priority))
+        if years is not None:
+            node_id = node.get('id')
+            if self.nodes_by_id.get(node_id) is node:
+                return years.get(node_id)
+        return resolve_year(node, priority)
+    
+    def get_year(self, node_id, priority=DATE_PRIORITY):
+        """按节点ID取预解析的年份（priority 须为 DATE_PRIORITY 或 RELEASE_DATE_ONLY）"""
+        years = self._year_index(tuple(priority))
+        if years is None:
+            node = self.get_node(node_id)
+            return resolve_year(node, priority) if node else None
+        return years.get(node_id)
+    
+    def get_years(self, node_ids, priority=DATE_PRIORITY):
+        """批量取年份，返回 int32 数组（缺失为 -1），基于列式存储"""
+        columns = self.columns
+        years = columns.resolved_year(priority)
+        ordinals = columns.ordinals(node_ids)
+        result = years[ordinals]
+        result[ordinals < 0] = -1
+        return result
+    
+    def _year_index(self, priority):
+        if priority not in RESOLVED_DATE_PRIORITIES:
+            return None
+        if self._resolved_years is None:
+            # 快照加载：由列式存储的年份列一次性生成
+            columns = self.columns
+            num_nodes = len(self.nodes_by_id)
+            node_ids = columns.node_ids[:num_nodes].tolist()
+            self._resolved_years = {}
+            for key in RESOLVED_DATE_PRIORITIES:
+                years = columns.resolved_year(key)[:num_nodes].tolist()
+                self._resolved_years[key] = {
+                    node_id: year for node_id, year in zip(node_ids, years) if year >= 0
+                }
+        return self._resolved_years[priority]
     
     def get_person_works(self, person_id):
         """获取某个音乐人的所有作品（按角色分类）"""
         works = defaultdict(list)  # role -> [work_nodes]
         
-        for edge_type, target_id in self.get_edges_from(person_id):
-            if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                target_node = self.get_node(target_id)
-                if target_node and target_node.get('Node Type') in ['Song', 'Album']:
-                    works[edge_type].append(target_node)
+        for edge_type, work_ids in self.person_work_index.role_work_ids(person_id).items():
+            works[edge_type] = [self.get_node(work_id) for work_id in work_ids]
         
         return works
     
@@ -105,11 +718,10 @@ class MusicGraphProcessor:
         """获取音乐人参与的专辑（通过共享Person推断）"""
         # 获取该音乐人的所有Album
         person_albums = []
-        for edge_type, target_id in self.get_edges_from(person_id):
-            if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                target_node = self.get_node(target_id)
-                if target_node and target_node.get('Node Type') == 'Album':
-                    person_albums.append((edge_type, target_node))
+        for edge_type, target_id in self.get_edges_from(person_id, types=ROLE_EDGE_TYPES):
+            target_node = self.get_node(target_id)
+            if target_node and target_node.get('Node Type') == 'Album':
+                person_albums.append((edge_type, target_node))
         
         return person_albums
     
@@ -121,45 +733,41 @@ class MusicGraphProcessor:
         if not album or album.get('Node Type') != 'Album':
             return []
         
-        album_date = self.extract_date(album)
-        album_genre = album.get('genre')
-        
-        # 如果指定了person_id，只找该音乐人的歌曲
+        index = self.album_song_index
+        # 如果指定了person_id，只找该音乐人的歌曲（时间相近且流派相同）
         if person_id:
-            person_songs = []
-            for edge_type, target_id in self.get_edges_from(person_id):
-                if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                    target_node = self.get_node(target_id)
-                    if target_node and target_node.get('Node Type') == 'Song':
-                        song_date = self.extract_date(target_node)
-                        song_genre = target_node.get('genre')
-                        
-                        # 判断是否属于该专辑：时间相近且流派相同
-                        if song_date and album_date:
-                            if abs(song_date - album_date) <= 2 and song_genre == album_genre:
-                                person_songs.append(target_node)
-            return person_songs
-        
-        # 否则，找到参与该专辑的所有Person，然后找他们的Song
-        all_songs = []
-        album_persons = []
-        for edge_type, source_id in self.get_edges_to(album_id):
-            if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                album_persons.append(source_id)
-        
-        for person_id in album_persons:
-            for edge_type, target_id in self.get_edges_from(person_id):
-                if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                    target_node = self.get_node(target_id)
-                    if target_node and target_node.get('Node Type') == 'Song':
-                        song_date = self.extract_date(target_node)
-                        song_genre = target_node.get('genre')
-                        
-                        if song_date and album_date:
-                            if abs(song_date - album_date) <= 2 and song_genre == album_genre:
-                                all_songs.append(target_node)
-        
-        return all_songs
+            key = index.album_key(album_id)
+            song_ids = index.songs_of(person_id, *key) if key else []
+        else:
+            # 否则，找到参与该专辑的所有Person，然后找他们的Song
+            album_persons = [source_id for _, source_id in self.get_edges_to(album_id, types=ROLE_EDGE_TYPES)]
+            song_ids = index.album_songs(album_id, album_persons)
+        return [self.get_node(song_id) for song_id in song_ids]
+    
+    def get_all_album_songs(self):
+        """整图批量推断专辑包含的歌曲：专辑ID -> 歌曲节点列表
+        与逐个调用 get_album_songs(album_id) 结果相同，一次计算后缓存
+        """
+        all_songs = self.album_song_index.all_album_songs(self, ROLE_EDGE_TYPES)
+        return {album_id: [self.get_node(song_id) for song_id in song_ids]
+                for album_id, song_ids in all_songs.items()}
+    
+    def get_all_person_works_grouped(self):
+        """整图批量按专辑分组：来源ID -> {'albums': {专辑ID: {'album', 'songs'}}, 'ungrouped_songs': [...]}
+        与逐个调用 Task1.get_person_works_grouped 结果相同，分组（ID形式）一次计算后缓存
+        """
+        catalogs = self.album_song_index.all_person_catalogs(self, self.person_work_index, ROLE_EDGE_TYPES)
+        return {person_id: self._materialize_catalog(catalog) for person_id, catalog in catalogs.items()}
+    
+    def _materialize_catalog(self, catalog):
+        album_ids, album_songs, ungrouped = catalog
+        get_node = self.get_node
+        return {
+            'albums': {album_id: {'album': get_node(album_id),
+                                  'songs': [get_node(s) for s in album_songs[album_id]]}
+                       for album_id in album_ids},
+            'ungrouped_songs': [get_node(s) for s in ungrouped],
+        }
 
 
 if __name__ == '__main__':
@@ -0,0 +1,104 @@
+"""
+共同署名（合作者）矩阵
+B 为 来源 × 作品 的关联矩阵（来源在作品上有任一角色边记 1），C = B·Bᵀ 去掉对角线：
+C[i, j] 为来源 i 与 j 共同参与的作品数，第 i 行的非零列即 i 的合作者。
+乘积直接在关联索引的反向数组（作品 -> 来源）上展开：每个作品的 k 个参与者两两配对，
+再按 (i, j) 合并计数，结果以CSR数组存放，行/列为 PersonWorkIndex.person_ids 的序号。
+"""
+import numpy as np
+
+from graph_csr import gather_spans
+
+
+class CoCreditMatrix:
+    """来源 × 来源 的共同署名计数（对称，不含对角线）"""
+
+    ARRAY_NAMES = ('offsets', 'columns', 'weights')
+
+    def __init__(self, person_ids, person_ordinal_of, offsets, columns, weights):
+        self.person_ids = person_ids
+        self.person_ordinal_of = person_ordinal_of
+        self.offsets = offsets      # 行区间
+        self.columns = columns      # 合作者序号（行内升序）
+        self.weights = weights      # 共同参与的作品数
+
+    @classmethod
+    def build(cls, index, persons_only=True, work_ids=None):
+        """index: PersonWorkIndex
+        persons_only: 只计 Person 来源（矩阵只含 Person 之间的共同署名，其他来源的行为空；
+                      Person 的行与 index.collaborators 相同）
+        work_ids: 只在这些作品上计数（缺省为全部作品）
+        """
+        person_ids = index.person_ids
+        num_persons = len(person_ids)
+        if work_ids is None:
+            works = np.arange(len(index.work_ids))
+        else:
+            work_ordinal_of = index.work_ordinal_of
+            works = np.array(sorted({work_ordinal_of[w] for w in work_ids if w in work_ordinal_of}),
+                             dtype=np.int64)
+        _, pos = gather_spans(index.source_offsets[works], index.source_offsets[works + 1])
+        if persons_only:
+            pos = pos[index.source_is_person[pos]]
+        # 参与记录：(作品, 来源序号)，同一作品的记录连续
+        member_work = np.repeat(np.arange(len(index.work_ids)), np.diff(index.source_offsets))[pos]
+        ordinal_of = index.person_ordinal_of
+        members = np.array([ordinal_of[s] for s in index.sources[pos].tolist()], dtype=np.int64)
+        starts = np.zeros(len(index.work_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(member_work, minlength=len(index.work_ids)), out=starts[1:])
+
+        # 作品内两两配对：每条记录与同作品的全部记录组合，去掉自身
+        left, right = gather_spans(starts[member_work], starts[member_work + 1])
+        src, dst = members[left], members[right]
+        keep = src != dst
+        keys, weights = np.unique(src[keep] * num_persons + dst[keep], return_counts=True)
+        rows = keys // num_persons
+        offsets = np.zeros(num_persons + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_persons), out=offsets[1:])
+        return cls(person_ids, ordinal_of, offsets, (keys % num_persons).astype(np.int32),
+                   weights.astype(np.int32))
+
+    def arrays(self):
+        """返回全部数组（名称 -> ndarray），供序列化使用"""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    @property
+    def num_pairs(self):
+        """非零元个数（每对合作者计两次）"""
+        return len(self.columns)
+
+    def counts(self):
+        """每个来源的合作者数（与 person_ids 对齐）"""
+        return np.diff(self.offsets)
+
+    def count_of(self, person_id):
+        ordinal = self.person_ordinal_of.get(person_id)
+        if ordinal is None:
+            return 0
+        return int(self.offsets[ordinal + 1] - self.offsets[ordinal])
+
+    def row(self, person_id):
+        """(合作者ID数组, 共同作品数数组)"""
+        ordinal = self.person_ordinal_of.get(person_id)
+        if ordinal is None:
+            return self.person_ids[:0], self.weights[:0]
+        lo, hi = self.offsets[ordinal], self.offsets[ordinal + 1]
+        return self.person_ids[self.columns[lo:hi]], self.weights[lo:hi]
+
+    def collaborators(self, person_id):
+        """合作者ID集合（不含自身）"""
+        return set(self.row(person_id)[0].tolist())
+
+    def pairs(self):
+        """每对合作者一次 (i < j)：(来源ID数组, 来源ID数组, 共同作品数数组)"""
+        rows = np.repeat(np.arange(len(self.person_ids)), self.counts())
+        upper = rows < self.columns
+        return (self.person_ids[rows[upper]], self.person_ids[self.columns[upper]],
+                self.weights[upper])
+
+    def to_scipy(self):
+        """转为 scipy.sparse.csr_matrix（需要安装 scipy）"""
+        from scipy.sparse import csr_matrix
+
+        n = len(self.person_ids)
+        return csr_matrix((self.weights, self.columns, self.offsets), shape=(n, n))
@@ -0,0 +1,180 @@
+"""
+列式节点属性存储
+按稠密节点序号存放常用属性的NumPy数组，代替逐个 node.get(...)：
+    node_type / genre   小整数分类编码（-1 表示缺失），编码表见 *_names
+    notable / single    bool
+    release_year / written_year / notoriety_year   int32 年份（-1 表示缺失，超出 int32 的年份同样记为缺失）
+对全部作品按流派/年份/成名的筛选变为向量化的掩码运算。
+"""
+import numpy as np
+
+MISSING = -1
+YEAR_FIELDS = ('release_date', 'written_date', 'notoriety_date')
+YEAR_COLUMNS = {
+    'release_date': 'release_year',
+    'written_date': 'written_year',
+    'notoriety_date': 'notoriety_year',
+}
+
+
+def parse_year(value):
+    """与 extract_date 相同的规则：纯数字字符串 -> int，否则 None"""
+    if value and isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+_YEAR_MAX = np.iinfo(np.int32).max
+
+
+def _code_dtype(size):
+    return np.int8 if size <= np.iinfo(np.int8).max else np.int16
+
+
+class NodeColumns:
+    """节点属性列，行号即节点序号（与 CSR 后端的序号一致）"""
+
+    ARRAY_NAMES = ('node_type', 'genre', 'notable', 'single',
+                   'release_year', 'written_year', 'notoriety_year')
+
+    def __init__(self, node_ids, node_type_names, genre_names, edge_type_names, arrays,
+                 ordinal_of=None):
+        self.node_ids = node_ids
+        self.node_type_names = list(node_type_names)
+        self.genre_names = list(genre_names)
+        self.edge_type_names = list(edge_type_names)
+        self.node_type_codes = {name: code for code, name in enumerate(self.node_type_names)}
+        self.genre_codes = {name: code for code, name in enumerate(self.genre_names)}
+        self.edge_type_codes = {name: code for code, name in enumerate(self.edge_type_names)}
+        if ordinal_of is None:
+            ordinal_of = {node_id: i for i, node_id in enumerate(np.asarray(node_ids).tolist())}
+        self.ordinal_of = ordinal_of
+        self._resolved_years = {}
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def build(cls, node_ids, get_node, edge_type_names, ordinal_of=None):
+        """一次遍历节点构建全部列；get_node(id) 返回节点字典，序号上不存在的节点记为缺失"""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        n = len(node_ids)
+        raw_types = []
+        raw_genres = []
+        notable = np.zeros(n, dtype=bool)
+        single = np.zeros(n, dtype=bool)
+        years = {column: np.full(n, MISSING, dtype=np.int32) for column in YEAR_COLUMNS.values()}
+
+        for i, node_id in enumerate(node_ids.tolist()):
+            node = get_node(node_id)
+            if node is None:
+                raw_types.append(MISSING)
+                raw_genres.append(None)
+                continue
+            raw_types.append(node.get('Node Type'))
+            raw_genres.append(node.get('genre') or None)
+            notable[i] = bool(node.get('notable'))
+            single[i] = bool(node.get('single'))
+            for field, column in YEAR_COLUMNS.items():
+                year = parse_year(node.get(field))
+                # 超出 int32 的数字串无法存放，按缺失处理
+                if year is not None and year <= _YEAR_MAX:
+                    years[column][i] = year
+
+        # 节点类型按首次出现顺序编码，流派按名称排序编码
+        node_type_names = list(dict.fromkeys(t for t in raw_types if t != MISSING))
+        genre_names = sorted({g for g in raw_genres if g is not None})
+        type_code = {t: c for c, t in enumerate(node_type_names)}
+        genre_code = {g: c for c, g in enumerate(genre_names)}
+        arrays = {
+            'node_type': np.array([type_code.get(t, MISSING) if t != MISSING else MISSING
+                                   for t in raw_types], dtype=_code_dtype(len(node_type_names))),
+            'genre': np.array([genre_code[g] if g is not None else MISSING for g in raw_genres],
+                              dtype=_code_dtype(len(genre_names))),
+            'notable': notable,
+            'single': single,
+        }
+        arrays.update(years)
+        return cls(node_ids, node_type_names, genre_names, edge_type_names, arrays,
+                   ordinal_of=ordinal_of)
+
+    def arrays(self):
+        """返回全部列（名称 -> ndarray），供序列化使用"""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    def meta(self):
+        return {
+            'node_type_names': self.node_type_names,
+            'genre_names': self.genre_names,
+            'edge_type_names': self.edge_type_names,
+        }
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    def ordinals(self, node_ids):
+        """节点ID序列 -> 序号数组（未知ID记为 -1）"""
+        get = self.ordinal_of.get
+        return np.fromiter((get(node_id, MISSING) for node_id in node_ids), dtype=np.int64)
+
+    def genre_code(self, genre):
+        return self.genre_codes.get(genre, MISSING)
+
+    def node_type_code(self, node_type):
+        return self.node_type_codes.get(node_type, MISSING)
+
+    def genres_of(self, node_type):
+        """这些类型的节点上出现过的流派（按名称排序，不含缺失）"""
+        codes = np.unique(self.genre[self.mask(node_type=node_type)])
+        return [self.genre_names[code] for code in codes.tolist() if code != MISSING]
+
+    def year_column(self, field):
+        """日期字段名（release_date 等）或列名（release_year 等） -> 年份列"""
+        return getattr(self, YEAR_COLUMNS.get(field, field))
+
+    def resolved_year(self, priority=YEAR_FIELDS):
+        """按日期字段优先级合并的年份列（取第一个非缺失的字段），按优先级缓存"""
+        priority = tuple(priority)
+        resolved = self._resolved_years.get(priority)
+        if resolved is None:
+            resolved = np.full(self.num_nodes, MISSING, dtype=np.int32)
+            for field in reversed(priority):
+                column = self.year_column(field)
+                resolved = np.where(column != MISSING, column, resolved)
+            self._resolved_years[priority] = resolved
+        return resolved
+
+    def mask(self, node_type=None, genre=None, notable=None, years=None, year_field='release_date'):
+        """向量化筛选，返回 bool 掩码
+        node_type / genre: 单个值或集合；notable: True/False；
+        years: (起始年, 结束年) 闭区间，按 year_field 指定的日期列筛选（缺失年份不匹配）
+        """
+        mask = np.ones(self.num_nodes, dtype=bool)
+        if node_type is not None:
+            mask &= self._isin(self.node_type, self.node_type_codes, node_type)
+        if genre is not None:
+            mask &= self._isin(self.genre, self.genre_codes, genre)
+        if notable is not None:
+            mask &= self.notable == bool(notable)
+        if years is not None:
+            start, end = years
+            column = self.year_column(year_field)
+            mask &= column != MISSING
+            if start is not None:
+                mask &= column >= start
+            if end is not None:
+                mask &= column <= end
+        return mask
+
+    def select(self, **filters):
+        """按 mask() 的条件筛选，返回节点ID数组"""
+        return self.node_ids[self.mask(**filters)]
+
+    @staticmethod
+    def _isin(column, codes, values):
+        if isinstance(values, str):
+            values = (values,)
+        wanted = [codes[v] for v in values if v in codes]
+        if len(wanted) == 1:
+            return column == wanted[0]
+        return np.isin(column, wanted)
@@ -0,0 +1,351 @@
+"""
+CSR（压缩稀疏行）邻接存储
+用NumPy数组代替 defaultdict(list) 中的元组列表，出边/入边各一份：
+    offsets[i]:offsets[i+1] 为第 i 个节点（稠密序号）的边区间
+    neighbors  对端节点序号（int32）
+    types      边类型编码（int8），编码表见 edge_type_names
+    eids       原始边序号（int32），用于恢复文件中的边顺序
+每个节点的区间内再按边类型分区，(节点, 类型) 的子区间由 type_offsets 表给出：
+    type_offsets[i * T + c] : type_offsets[i * T + c + 1]   （T 为边类型数）
+因此按类型取边只访问匹配的边，按类型的度数是 O(1)。
+"""
+from array import array
+
+import numpy as np
+
+
+class CSRBuilder:
+    """增量收集节点与边，最后一次性生成 CSRGraph
+    节点与边可以任意顺序到达（流式加载时 links 可能先于 nodes）：
+    边先以原始ID缓存，build() 时统一映射为稠密序号
+    """
+
+    def __init__(self):
+        self.node_ids = []
+        self.edge_type_names = []
+        self._type_code = {}
+        self._src = array('q')
+        self._dst = array('q')
+        self._types = array('b')
+
+    def add_node(self, node_id):
+        """登记节点，序号按登记顺序分配"""
+        self.node_ids.append(node_id)
+
+    def add_edge(self, source, target, edge_type):
+        """登记一条边；端点若不是已登记节点，build() 时追加在节点之后"""
+        code = self._type_code.get(edge_type)
+        if code is None:
+            code = len(self.edge_type_names)
+            if code > np.iinfo(np.int8).max:
+                raise ValueError(f"边类型数量超过int8上限: {edge_type}")
+            self._type_code[edge_type] = code
+            self.edge_type_names.append(edge_type)
+        self._src.append(source)
+        self._dst.append(target)
+        self._types.append(code)
+
+    def build(self):
+        """生成 CSRGraph，并释放收集缓冲区"""
+        src_ids = np.frombuffer(self._src, dtype=np.int64)
+        dst_ids = np.frombuffer(self._dst, dtype=np.int64)
+        types = np.frombuffer(self._types, dtype=np.int8).copy()
+        node_ids, src, dst = map_endpoints(self.node_ids, src_ids, dst_ids)
+        self._src = self._dst = self._types = None
+        return CSRGraph.from_edges(node_ids, self.edge_type_names, src, dst, types)
+
+
+def map_endpoints(node_ids, src_ids, dst_ids):
+    """边端点原始ID -> 稠密序号，返回 (node_ids, src, dst)
+    未登记的端点按首次出现顺序追加在 node_ids 之后（源、目标交替出现的顺序）
+    """
+    node_ids = np.asarray(node_ids, dtype=np.int64)
+    endpoints = np.column_stack([src_ids, dst_ids]).ravel()
+    unknown = ~np.isin(endpoints, node_ids)
+    if unknown.any():
+        extra, first = np.unique(endpoints[unknown], return_index=True)
+        node_ids = np.concatenate([node_ids, extra[np.argsort(first)]])
+
+    order = np.argsort(node_ids, kind='stable')
+    sorted_ids = node_ids[order]
+    src = order[np.searchsorted(sorted_ids, src_ids)].astype(np.int32)
+    dst = order[np.searchsorted(sorted_ids, dst_ids)].astype(np.int32)
+    return node_ids, src, dst
+
+
+def gather_spans(lo, hi):
+    """多个 [lo, hi) 区间展开为 (区间序号, 位置) 两个数组"""
+    lens = (hi - lo).astype(np.int64)
+    total = int(lens.sum())
+    rows = np.repeat(np.arange(len(lo)), lens)
+    starts = np.repeat(lo.astype(np.int64) - np.cumsum(lens) + lens, lens)
+    return rows, starts + np.arange(total)
+
+
+def _csr_order(keys, size):
+    """按 keys 稳定排序（保持原始边顺序），返回 (offsets, order)"""
+    order = np.argsort(keys, kind='stable')
+    counts = np.bincount(keys, minlength=size)
+    offsets = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, order.astype(np.int32)
+
+
+def _csr_typed_order(nodes, types, num_nodes, num_types):
+    """按 (节点, 边类型) 分区并保持原始边顺序，返回 (type_offsets, order)"""
+    keys = nodes.astype(np.int64) * num_types + types
+    return _csr_order(keys, num_nodes * num_types)
+
+
+class CSRGraph:
+    """出边/入边/按类型三份CSR索引，所有数组只读共享"""
+
+    ARRAY_NAMES = (
+        'out_type_offsets', 'out_neighbors', 'out_types', 'out_eids',
+        'in_type_offsets', 'in_neighbors', 'in_types', 'in_eids',
+        'type_offsets', 'type_src', 'type_dst',
+    )
+
+    def __init__(self, node_ids, edge_type_names, arrays, ordinal_of=None):
+        self.node_ids = node_ids
+        self.edge_type_names = list(edge_type_names)
+        self.edge_type_codes = {name: code for code, name in enumerate(self.edge_type_names)}
+        self.num_types = max(len(self.edge_type_names), 1)
+        if ordinal_of is None:
+            ordinal_of = {node_id: i for i, node_id in enumerate(node_ids.tolist())}
+        self.ordinal_of = ordinal_of
+
+        T = self.num_types
+        self.out_type_offsets = arrays['out_type_offsets']
+        self.out_offsets = self.out_type_offsets[::T]
+        self.out_neighbors = arrays['out_neighbors']
+        self.out_types = arrays['out_types']
+        self.out_eids = arrays['out_eids']
+        self.in_type_offsets = arrays['in_type_offsets']
+        self.in_offsets = self.in_type_offsets[::T]
+        self.in_neighbors = arrays['in_neighbors']
+        self.in_types = arrays['in_types']
+        self.in_eids = arrays['in_eids']
+        # 按边类型分区：type_offsets[c]:type_offsets[c+1] 为类型 c 的 (src, dst)
+        self.type_offsets = arrays['type_offsets']
+        self.type_src = arrays['type_src']
+        self.type_dst = arrays['type_dst']
+
+    @classmethod
+    def from_edges(cls, node_ids, edge_type_names, src, dst, types, ordinal_of=None):
+        """由边数组（稠密序号，按原始边顺序）构建"""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        n = len(node_ids)
+        T = max(len(edge_type_names), 1)
+        out_type_offsets, out_order = _csr_typed_order(src, types, n, T)
+        in_type_offsets, in_order = _csr_typed_order(dst, types, n, T)
+        type_offsets, type_order = _csr_order(types.astype(np.int32), len(edge_type_names))
+        arrays = {
+            'out_type_offsets': out_type_offsets,
+            'out_neighbors': dst[out_order],
+            'out_types': types[out_order],
+            'out_eids': out_order,
+            'in_type_offsets': in_type_offsets,
+            'in_neighbors': src[in_order],
+            'in_types': types[in_order],
+            'in_eids': in_order,
+            'type_offsets': type_offsets,
+            'type_src': src[type_order],
+            'type_dst': dst[type_order],
+        }
+        return cls(node_ids, edge_type_names, arrays, ordinal_of=ordinal_of)
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.out_neighbors)
+
+    def arrays(self):
+        """返回全部索引数组（名称 -> ndarray），供序列化使用"""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    def _side(self, direction):
+        if direction == 'out':
+            return self.out_type_offsets, self.out_neighbors, self.out_types, self.out_eids
+        if direction == 'in':
+            return self.in_type_offsets, self.in_neighbors, self.in_types, self.in_eids
+        raise ValueError(f"direction 只能是 'out' 或 'in': {direction}")
+
+    def type_codes(self, edge_types):
+        """边类型名 -> 编码列表（忽略图中不存在的类型）"""
+        if isinstance(edge_types, str):
+            edge_types = (edge_types,)
+        codes = self.edge_type_codes
+        return sorted(codes[t] for t in set(edge_types) if t in codes)
+
+    # ---------- 零拷贝接口：返回数组切片（视图） ----------
+
+    def out_slice(self, ordinal):
+        """出边切片 (邻居序号, 边类型编码)，区间内按边类型分组"""
+        lo, hi = self.out_offsets[ordinal], self.out_offsets[ordinal + 1]
+        return self.out_neighbors[lo:hi], self.out_types[lo:hi]
+
+    def in_slice(self, ordinal):
+        """入边切片 (邻居序号, 边类型编码)，区间内按边类型分组"""
+        lo, hi = self.in_offsets[ordinal], self.in_offsets[ordinal + 1]
+        return self.in_neighbors[lo:hi], self.in_types[lo:hi]
+
+    def typed_slice(self, ordinal, code, direction='out'):
+        """(节点, 边类型) 子区间的邻居序号切片"""
+        type_offsets, neighbors, _, _ = self._side(direction)
+        base = ordinal * self.num_types + code
+        return neighbors[type_offsets[base]:type_offsets[base + 1]]
+
+    def degree(self, ordinal, codes, direction='out'):
+        """按类型的度数：每个类型一次偏移表查找"""
+        type_offsets = self._side(direction)[0]
+        base = ordinal * self.num_types
+        return int(sum(type_offsets[base + c + 1] - type_offsets[base + c] for c in codes))
+
+    def degree_table(self, direction='out'):
+        """节点 × 边类型 的度数矩阵（int32，行按节点序号，列按边类型编码）"""
+        type_offsets = self._side(direction)[0]
+        return np.diff(type_offsets).reshape(self.num_nodes, self.num_types)
+
+    def expand(self, frontier, edge_types=None, direction='out'):
+        """批量取邻居：frontier 为节点序号数组，edge_types 为空表示全部类型
+        返回 (frontier 行号, 邻居序号, 原始边序号, 边类型编码)，按行号、再按原始边顺序排列
+        """
+        type_offsets, neighbors, types, eids = self._side(direction)
+        T = self.num_types
+        base = np.asarray(frontier, dtype=np.int64) * T
+        if edge_types is None:
+            spans = [(type_offsets[base], type_offsets[base + T])]
+        else:
+            spans = [(type_offsets[base + c], type_offsets[base + c + 1])
+                     for c in self.type_codes(edge_types)]
+        if not spans:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty.astype(np.int32), empty.astype(np.int32), empty.astype(np.int8)
+        parts = [gather_spans(lo, hi) for lo, hi in spans]
+        rows = np.concatenate([r for r, _ in parts])
+        pos = np.concatenate([p for _, p in parts])
+        edge_ids = eids[pos]
+        if len(parts) > 1 or edge_types is None:
+            # 区间内按类型分组，恢复为原始边顺序
+            order = np.lexsort((edge_ids, rows))
+            rows, pos, edge_ids = rows[order], pos[order], edge_ids[order]
+        return rows, neighbors[pos], edge_ids, types[pos]
+
+    def type_slice(self, code):
+        """某类型全部边的切片 (源序号, 目标序号)"""
+        lo, hi = self.type_offsets[code], self.type_offsets[code + 1]
+        return self.type_src[lo:hi], self.type_dst[lo:hi]
+
+    # ---------- 增量更新：数组只读，按原始边顺序重建 ----------
+
+    def edge_arrays(self):
+        """按原始边顺序还原 (源序号, 目标序号, 类型编码) 数组"""
+        src = np.empty(self.num_edges, dtype=np.int32)
+        dst = np.empty(self.num_edges, dtype=np.int32)
+        types = np.empty(self.num_edges, dtype=np.int8)
+        owners = np.arange(self.num_nodes, dtype=np.int32)
+        src[self.out_eids] = np.repeat(owners, np.diff(self.out_offsets))
+        dst[self.out_eids] = self.out_neighbors
+        types[self.out_eids] = self.out_types
+        return src, dst, types
+
+    def find_eids(self, source, target, edge_type):
+        """(source, target, edge_type) 匹配的原始边序号，升序"""
+        ordinal = self.ordinal_of.get(source)
+        code = self.edge_type_codes.get(edge_type)
+        neighbor = self.ordinal_of.get(target)
+        if ordinal is None or code is None or neighbor is None:
+            return []
+        base = ordinal * self.num_types + code
+        lo, hi = self.out_type_offsets[base], self.out_type_offsets[base + 1]
+        eids = self.out_eids[lo:hi][self.out_neighbors[lo:hi] == neighbor]
+        return sorted(eids.tolist())
+
+    def incident_eids(self, node_id):
+        """节点全部出边与入边的原始边序号"""
+        ordinal = self.ordinal_of.get(node_id)
+        if ordinal is None:
+            return []
+        eids = []
+        for offsets, side_eids in ((self.out_offsets, self.out_eids), (self.in_offsets, self.in_eids)):
+            eids.extend(side_eids[offsets[ordinal]:offsets[ordinal + 1]].tolist())
+        return eids
+
+    def with_delta(self, node_ids, removed_eids=(), added_edges=()):
+        """返回应用增量后的新 CSRGraph
+        node_ids: 更新后已登记节点的ID序列；removed_eids: 要删除的原始边序号；
+        added_edges: [(source, target, edge_type)]，按顺序追加在保留的边之后
+        """
+        src, dst, types = self.edge_arrays()
+        keep = np.ones(self.num_edges, dtype=bool)
+        keep[list(removed_eids)] = False
+
+        names = list(self.edge_type_names)
+        codes = dict(self.edge_type_codes)
+        added_types = []
+        for _, _, edge_type in added_edges:
+            code = codes.get(edge_type)
+            if code is None:
+                code = len(names)
+                if code > np.iinfo(np.int8).max:
+                    raise ValueError(f"边类型数量超过int8上限: {edge_type}")
+                codes[edge_type] = code
+                names.append(edge_type)
+            added_types.append(code)
+
+        src_ids = np.concatenate([self.node_ids[src[keep]],
+                                  np.array([e[0] for e in added_edges], dtype=np.int64)])
+        dst_ids = np.concatenate([self.node_ids[dst[keep]],
+                                  np.array([e[1] for e in added_edges], dtype=np.int64)])
+        types = np.concatenate([types[keep], np.array(added_types, dtype=np.int8)])
+        node_ids, src, dst = map_endpoints(node_ids, src_ids, dst_ids)
+        return CSRGraph.from_edges(node_ids, names, src, dst, types)
+
+    # ---------- 兼容接口：返回与字典后端相同的元组列表 ----------
+
+    def edges(self, node_id, direction='out', edge_types=None):
+        """(边类型, 邻居ID) 列表，按原始边顺序；edge_types 为空表示全部类型"""
+        ordinal = self.ordinal_of.get(node_id)
+        if ordinal is None:
+            return []
+        type_offsets, neighbors, types, eids = self._side(direction)
+        base = ordinal * self.num_types
+        if edge_types is None:
+            spans = [(type_offsets[base], type_offsets[base + self.num_types])]
+        else:
+            spans = [(type_offsets[base + c], type_offsets[base + c + 1])
+                     for c in self.type_codes(edge_types)]
+            spans = [(lo, hi) for lo, hi in spans if hi > lo]
+        if not spans:
+            return []
+        if len(spans) == 1:
+            idx = slice(*spans[0])
+        else:
+            idx = np.concatenate([np.arange(lo, hi) for lo, hi in spans])
+        seg_types = types[idx]
+        seg_neighbors = neighbors[idx]
+        if len(spans) > 1 or edge_types is None:
+            # 区间内按类型分组，恢复为原始边顺序
+            order = np.argsort(eids[idx], kind='stable')
+            seg_types = seg_types[order]
+            seg_neighbors = seg_neighbors[order]
+        names = self.edge_type_names
+        return list(zip([names[c] for c in seg_types.tolist()],
+                        self.node_ids[seg_neighbors].tolist()))
+
+    def edges_from(self, node_id, edge_types=None):
+        return self.edges(node_id, 'out', edge_types)
+
+    def edges_to(self, node_id, edge_types=None):
+        return self.edges(node_id, 'in', edge_types)
+
+    def edges_by_type(self, edge_type):
+        code = self.edge_type_codes.get(edge_type)
+        if code is None:
+            return []
+        src, dst = self.type_slice(code)
+        return list(zip(self.node_ids[src].tolist(), self.node_ids[dst].tolist()))
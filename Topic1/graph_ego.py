@@ -0,0 +1,153 @@
+"""
+k 跳邻域 / 自我中心子图
+以一个或多个种子节点为中心做有界BFS（按跳数、边类型、方向、节点上限），
+返回紧凑的节点序号数组和诱导边。批量模式把许多个中心放在同一次扫描里：
+所有 (中心, 节点) 对编码为 中心 * N + 节点 的整数键，每一跳对全部前沿成批取邻居、去重。
+"""
+import numpy as np
+
+DIRECTIONS = ('out', 'in', 'both')
+
+
+class EgoSubgraph:
+    """单个中心的子图视图：节点按 (跳数, 发现顺序) 排列，诱导边按原始边顺序"""
+
+    def __init__(self, graph, nodes, hops, src, dst, types):
+        self.graph = graph
+        self.nodes = nodes      # 节点序号
+        self.hops = hops        # 与种子的跳数（种子为 0）
+        self.src = src          # 诱导边：源/目标序号，边类型编码
+        self.dst = dst
+        self.types = types
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def node_ids(self):
+        return self.graph.node_ids[self.nodes]
+
+    @property
+    def num_edges(self):
+        return len(self.src)
+
+    def edges(self):
+        """诱导边 [(源ID, 目标ID, 边类型)]"""
+        node_ids = self.graph.node_ids
+        names = self.graph.edge_type_names
+        return list(zip(node_ids[self.src].tolist(), node_ids[self.dst].tolist(),
+                        [names[c] for c in self.types.tolist()]))
+
+
+class EgoBatch:
+    """批量结果：第 g 个中心的节点为 nodes[node_offsets[g]:node_offsets[g+1]]，边同理"""
+
+    def __init__(self, graph, node_offsets, nodes, hops, edge_offsets, src, dst, types):
+        self.graph = graph
+        self.node_offsets = node_offsets
+        self.nodes = nodes
+        self.hops = hops
+        self.edge_offsets = edge_offsets
+        self.src = src
+        self.dst = dst
+        self.types = types
+
+    def __len__(self):
+        return len(self.node_offsets) - 1
+
+    def __getitem__(self, g):
+        nlo, nhi = self.node_offsets[g], self.node_offsets[g + 1]
+        elo, ehi = self.edge_offsets[g], self.edge_offsets[g + 1]
+        return EgoSubgraph(self.graph, self.nodes[nlo:nhi], self.hops[nlo:nhi],
+                           self.src[elo:ehi], self.dst[elo:ehi], self.types[elo:ehi])
+
+    def __iter__(self):
+        return (self[g] for g in range(len(self)))
+
+    def sizes(self):
+        return np.diff(self.node_offsets)
+
+
+def _first_unique(keys):
+    """按首次出现顺序去重"""
+    _, first = np.unique(keys, return_index=True)
+    return keys[np.sort(first)]
+
+
+def _offsets(groups, num_groups):
+    offsets = np.zeros(num_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(groups, minlength=num_groups), out=offsets[1:])
+    return offsets
+
+
+def _neighbors(graph, frontier, edge_types, direction):
+    """前沿节点的邻居 (前沿行号, 邻居序号)，每行内出边在前、入边在后，各按原始边顺序"""
+    sides = ('out', 'in') if direction == 'both' else (direction,)
+    parts = [graph.expand(frontier, edge_types, side)[:2] for side in sides]
+    if len(parts) == 1:
+        return parts[0]
+    rows = np.concatenate([r for r, _ in parts])
+    found = np.concatenate([f for _, f in parts])
+    order = np.argsort(rows, kind='stable')
+    return rows[order], found[order]
+
+
+def ego_sweep(graph, seed_groups, hops=1, edge_types=None, direction='both', max_nodes=None):
+    """对每组种子做有界BFS，返回 EgoBatch
+    seed_groups: 每个中心的种子序号列表；max_nodes: 每个中心最多保留的节点数（种子总是保留，
+    最后一跳超出上限时按发现顺序截断）
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction 只能是 {DIRECTIONS}: {direction}")
+    n = graph.num_nodes
+    num_groups = len(seed_groups)
+    seed_group = np.repeat(np.arange(num_groups, dtype=np.int64),
+                           [len(seeds) for seeds in seed_groups])
+    seeds = np.concatenate([np.asarray(s, dtype=np.int64) for s in seed_groups]) \
+        if num_groups else np.empty(0, dtype=np.int64)
+
+    frontier = _first_unique(seed_group * n + seeds)
+    visited = [frontier]
+    levels = [np.zeros(len(frontier), dtype=np.int8)]
+    counts = np.bincount(frontier // n, minlength=num_groups)
+    seen = np.sort(frontier)
+
+    for hop in range(1, hops + 1):
+        if not len(frontier):
+            break
+        rows, found = _neighbors(graph, frontier % n, edge_types, direction)
+        keys = _first_unique((frontier // n)[rows] * n + found)
+        keys = keys[~np.isin(keys, seen, assume_unique=True)]
+        if max_nodes is not None and len(keys):
+            groups = keys // n
+            order = np.argsort(groups, kind='stable')
+            group_start = _offsets(groups, num_groups)[:-1]
+            rank = np.empty(len(keys), dtype=np.int64)
+            rank[order] = np.arange(len(keys)) - group_start[groups[order]]
+            keys = keys[rank < np.maximum(max_nodes - counts[groups], 0)]
+        if not len(keys):
+            break
+        visited.append(keys)
+        levels.append(np.full(len(keys), hop, dtype=np.int8))
+        counts += np.bincount(keys // n, minlength=num_groups)
+        seen = np.union1d(seen, keys)
+        frontier = keys
+
+    keys = np.concatenate(visited)
+    level = np.concatenate(levels)
+    groups = keys // n
+    order = np.argsort(groups, kind='stable')
+    keys, level, groups = keys[order], level[order], groups[order]
+    nodes = (keys % n).astype(np.int32)
+    node_offsets = _offsets(groups, num_groups)
+
+    # 诱导边：成员节点的出边中，目标也属于同一中心的那些
+    rows, found, eids, types = graph.expand(nodes, edge_types, 'out')
+    edge_groups = groups[rows]
+    inside = np.isin(edge_groups * n + found, keys)
+    rows, found, eids, types, edge_groups = (
+        rows[inside], found[inside], eids[inside], types[inside], edge_groups[inside])
+    order = np.lexsort((eids, edge_groups))
+    return EgoBatch(graph, node_offsets, nodes, level,
+                    _offsets(edge_groups[order], num_groups),
+                    nodes[rows[order]], found[order].astype(np.int32), types[order])
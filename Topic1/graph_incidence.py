@@ -0,0 +1,294 @@
+"""
+音乐人 × 作品 关联索引
+一次遍历全部角色边（PerformerOf / ComposerOf / LyricistOf / ProducerOf），物化为CSR数组：
+    正向  来源节点 -> 去重后的作品ID + 4位角色掩码（bit i 对应 ROLE_EDGE_TYPES[i]）
+          另存按角色分组的作品序列（含重复边），可还原 get_person_works 的结果
+    反向  作品 -> 参与的来源ID + 角色掩码 + 是否为 Person
+之后的去重作品列表、角色计数、合作者查询都只是数组切片读取。
+"""
+import numpy as np
+
+WORK_TYPES = ('Song', 'Album')
+
+
+def _offsets(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+class PersonWorkIndex:
+    """来源节点（通常为 Person，也包括乐队等）与其 Song/Album 作品的关联"""
+
+    ARRAY_NAMES = (
+        'person_ids', 'role_counts', 'role_offsets', 'role_works', 'role_codes',
+        'offsets', 'works', 'masks',
+        'work_ids', 'source_offsets', 'sources', 'source_masks', 'source_is_person',
+    )
+
+    def __init__(self, role_names, arrays):
+        self.role_names = list(role_names)
+        self.role_bits = {role: 1 << i for i, role in enumerate(self.role_names)}
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        # person_ids: 来源节点；role_counts: (来源数, 角色数) 角色边条数（含重复边）
+        self.person_ordinal_of = {pid: i for i, pid in enumerate(self.person_ids.tolist())}
+        # role_offsets / role_works / role_codes: 按角色分组的作品序列，角色按首次出现顺序，组内按原始边顺序
+        # offsets / works / masks: 去重后的作品及角色掩码，顺序与上面序列中首次出现的顺序一致
+        # work_ids / source_offsets / sources / ...: 反向索引 作品 -> 来源（按来源顺序）
+        self.work_ordinal_of = {wid: i for i, wid in enumerate(self.work_ids.tolist())}
+
+    @classmethod
+    def build(cls, processor, role_names):
+        """由处理器的按类型取边接口与列式节点类型构建"""
+        columns = processor.columns
+        # 图中不存在的类型编码为 -1，与悬空节点（同为 -1）混淆，须先剔除
+        work_codes = [code for code in map(columns.node_type_code, WORK_TYPES) if code >= 0]
+        person_code = columns.node_type_code('Person')
+        node_type = columns.node_type.tolist()
+        ordinal_of = columns.ordinal_of
+        role_code = {role: i for i, role in enumerate(role_names)}
+
+        def type_code(node_id):
+            ordinal = ordinal_of.get(node_id)
+            return node_type[ordinal] if ordinal is not None else None
+
+        # 来源节点：已登记节点按加载顺序在前，其余按首次出现顺序
+        sources = {}
+        for role in role_names:
+            for source_id, _ in processor.get_edges_by_type(role):
+                sources.setdefault(source_id, None)
+        person_ids = [node_id for node_id in processor.nodes_by_id if node_id in sources]
+        registered = set(person_ids)
+        person_ids.extend(s for s in sources if s not in registered)
+
+        role_counts = np.zeros((len(person_ids), len(role_names)), dtype=np.int32)
+        role_lengths, role_works, role_codes = [], [], []
+        lengths, works, masks = [], [], []
+        work_sources = {}
+        for i, person_id in enumerate(person_ids):
+            grouped = {}
+            for edge_type, target_id in processor.get_edges_from(person_id, types=role_names):
+                if type_code(target_id) in work_codes:
+                    grouped.setdefault(edge_type, []).append(target_id)
+            unique = {}
+            for edge_type, targets in grouped.items():
+                code = role_code[edge_type]
+                role_counts[i, code] = len(targets)
+                role_works.extend(targets)
+                role_codes.extend([code] * len(targets))
+                for target_id in targets:
+                    unique[target_id] = unique.get(target_id, 0) | (1 << code)
+            role_lengths.append(sum(len(t) for t in grouped.values()))
+            lengths.append(len(unique))
+            works.extend(unique)
+            masks.extend(unique.values())
+            is_person = person_code >= 0 and type_code(person_id) == person_code
+            for work_id, mask in unique.items():
+                work_sources.setdefault(work_id, []).append((person_id, mask, is_person))
+
+        source_lengths = [len(v) for v in work_sources.values()]
+        triples = [triple for v in work_sources.values() for triple in v]
+        return cls(role_names, {
+            'person_ids': np.asarray(person_ids, dtype=np.int64),
+            'role_counts': role_counts,
+            'role_offsets': _offsets(role_lengths),
+            'role_works': np.asarray(role_works, dtype=np.int64),
+            'role_codes': np.asarray(role_codes, dtype=np.int8),
+            'offsets': _offsets(lengths),
+            'works': np.asarray(works, dtype=np.int64),
+            'masks': np.asarray(masks, dtype=np.uint8),
+            'work_ids': np.asarray(list(work_sources), dtype=np.int64),
+            'source_offsets': _offsets(source_lengths),
+            'sources': np.asarray([t[0] for t in triples], dtype=np.int64),
+            'source_masks': np.asarray([t[1] for t in triples], dtype=np.uint8),
+            'source_is_person': np.asarray([t[2] for t in triples], dtype=bool),
+        })
+
+    def arrays(self):
+        """返回全部数组（名称 -> ndarray），供序列化使用"""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    def _span(self, offsets, ordinal):
+        if ordinal is None:
+            return 0, 0
+        return offsets[ordinal], offsets[ordinal + 1]
+
+    def work_ids_of(self, person_id):
+        """去重后的作品ID列表（与对 get_person_works 结果按ID去重的顺序一致）"""
+        lo, hi = self._span(self.offsets, self.person_ordinal_of.get(person_id))
+        return self.works[lo:hi].tolist()
+
+    def works_with_masks(self, person_id):
+        """(作品ID数组, 角色掩码数组) 切片"""
+        lo, hi = self._span(self.offsets, self.person_ordinal_of.get(person_id))
+        return self.works[lo:hi], self.masks[lo:hi]
+
+    def role_work_ids(self, person_id):
+        """角色 -> 作品ID列表（含重复边，角色按首次出现顺序），即 get_person_works 的ID形式"""
+        lo, hi = self._span(self.role_offsets, self.person_ordinal_of.get(person_id))
+        grouped = {}
+        names = self.role_names
+        for code, work_id in zip(self.role_codes[lo:hi].tolist(), self.role_works[lo:hi].tolist()):
+            grouped.setdefault(names[code], []).append(work_id)
+        return grouped
+
+    def role_count_map(self, person_id):
+        """角色 -> 该角色的作品边数（只含出现过的角色）"""
+        ordinal = self.person_ordinal_of.get(person_id)
+        if ordinal is None:
+            return {}
+        counts = self.role_counts[ordinal].tolist()
+        return {role: n for role, n in zip(self.role_names, counts) if n}
+
+    def roles_of(self, person_id, mask=None):
+        """角色集合；mask 为若干作品角色掩码的按位或时，只取这些作品上的角色"""
+        if mask is None:
+            return set(self.role_count_map(person_id))
+        return {role for role, bit in self.role_bits.items() if mask & bit}
+
+    def persons_of(self, work_id, persons_only=True):
+        """参与该作品（任一角色）的来源ID列表；persons_only 时只取 Person"""
+        lo, hi = self._span(self.source_offsets, self.work_ordinal_of.get(work_id))
+        sources = self.sources[lo:hi]
+        if persons_only:
+            sources = sources[self.source_is_person[lo:hi]]
+        return sources.tolist()
+
+    def persons_of_works(self, work_ids, persons_only=True):
+        """参与这些作品的来源集合"""
+        persons = set()
+        for work_id in work_ids:
+            persons.update(self.persons_of(work_id, persons_only))
+        return persons
+
+    def collaborators(self, person_id, work_ids=None, persons_only=True):
+        """与该来源在作品上合作过的来源集合（不含自身）；work_ids 缺省为其全部作品"""
+        if work_ids is None:
+            work_ids = self.work_ids_of(person_id)
+        persons = self.persons_of_works(work_ids, persons_only)
+        persons.discard(person_id)
+        return persons
+
+
+class AlbumSongIndex:
+    """(来源, 流派, 年份) 分桶的歌曲索引，供专辑 -> 歌曲推断使用
+    推断规则与 get_album_songs 一致：同一来源的 Song，流派与专辑相同且年份相差不超过 YEAR_WINDOW。
+    桶内记录歌曲在该来源角色边列表中的位置，合并若干桶后按位置排序即恢复原始边顺序（含重复边）。
+    """
+
+    YEAR_WINDOW = 2
+
+    def __init__(self, buckets, genres, years, ordinal_of):
+        self.buckets = buckets          # (来源, 流派编码, 年份) -> [(边位置, 歌曲ID)]
+        self._genres = genres
+        self._years = years
+        self._ordinal_of = ordinal_of
+        self._all_album_songs = None
+        self._all_catalogs = None
+        self._node_types = None
+
+    @classmethod
+    def build(cls, processor, role_names, source_ids):
+        """source_ids: 全部角色边来源；年份按默认日期优先级，流派取列式编码"""
+        columns = processor.columns
+        song_code = columns.node_type_code('Song')
+        node_type = columns.node_type.tolist()
+        genres = columns.genre.tolist()
+        years = columns.resolved_year().tolist()
+        ordinal_of = columns.ordinal_of
+
+        buckets = {}
+        for source_id in source_ids:
+            for pos, (_, target_id) in enumerate(processor.get_edges_from(source_id, types=role_names)):
+                ordinal = ordinal_of.get(target_id)
+                if ordinal is None or node_type[ordinal] != song_code or years[ordinal] <= 0:
+                    continue
+                key = (source_id, genres[ordinal], years[ordinal])
+                buckets.setdefault(key, []).append((pos, target_id))
+        return cls(buckets, genres, years, ordinal_of)
+
+    def album_key(self, album_id):
+        """专辑的 (流派编码, 年份)；无年份的专辑返回 None（不推断任何歌曲）"""
+        ordinal = self._ordinal_of.get(album_id)
+        if ordinal is None or self._years[ordinal] <= 0:
+            return None
+        return self._genres[ordinal], self._years[ordinal]
+
+    def songs_of(self, source_id, genre, year):
+        """某来源中与 (流派, 年份) 相匹配的歌曲ID，按原始边顺序"""
+        hits = []
+        for y in range(year - self.YEAR_WINDOW, year + self.YEAR_WINDOW + 1):
+            hits.extend(self.buckets.get((source_id, genre, y), ()))
+        hits.sort()
+        return [song_id for _, song_id in hits]
+
+    def album_songs(self, album_id, source_ids):
+        """依次对每个来源（可重复）做桶查找并拼接结果"""
+        key = self.album_key(album_id)
+        if key is None:
+            return []
+        songs = []
+        for source_id in source_ids:
+            songs.extend(self.songs_of(source_id, *key))
+        return songs
+
+    def all_album_songs(self, processor, role_names):
+        """整图批量推断：专辑ID -> 歌曲ID列表（对应 get_album_songs(album_id) 不指定音乐人），结果缓存"""
+        if self._all_album_songs is None:
+            result = {}
+            for album in processor.get_nodes_by_type('Album'):
+                album_id = album['id']
+                if album_id in result:
+                    continue
+                contributors = [s for _, s in processor.get_edges_to(album_id, types=role_names)]
+                result[album_id] = self.album_songs(album_id, contributors)
+            self._all_album_songs = result
+        return self._all_album_songs
+
+    def person_catalog(self, processor, index, person_id, role_names):
+        """某来源的作品按专辑分组（get_person_works_grouped 的ID形式）：
+        (专辑ID列表, 专辑ID -> 推断歌曲ID列表, 未分组歌曲ID列表)
+        专辑与歌曲按 get_person_works 的拼接顺序（含重复边）；未分组 = 不在任何专辑推断结果中的歌曲
+        """
+        columns = processor.columns
+        album_code = columns.node_type_code('Album')
+        song_code = columns.node_type_code('Song')
+        if self._node_types is None:
+            self._node_types = columns.node_type.tolist()
+        node_type = self._node_types
+        ordinal_of = columns.ordinal_of
+        album_ids, song_ids = {}, []
+        for work_ids in index.role_work_ids(person_id).values():
+            for work_id in work_ids:
+                code = node_type[ordinal_of[work_id]]
+                if code == album_code:
+                    album_ids[work_id] = None
+                elif code == song_code:
+                    song_ids.append(work_id)
+        album_songs = {}
+        for album_id in album_ids:
+            if person_id:
+                key = self.album_key(album_id)
+                album_songs[album_id] = self.songs_of(person_id, *key) if key else []
+            else:
+                # 与 get_album_songs 相同：ID 为假值时按专辑的全部参与者推断
+                contributors = [s for _, s in processor.get_edges_to(album_id, types=role_names)]
+                album_songs[album_id] = self.album_songs(album_id, contributors)
+        grouped = {song_id for songs in album_songs.values() for song_id in songs}
+        return list(album_ids), album_songs, [s for s in song_ids if s not in grouped]
+
+    def all_person_catalogs(self, processor, index, role_names):
+        """整图批量：来源ID -> person_catalog 的结果（全部角色边来源），一次计算后缓存"""
+        if self._all_catalogs is None:
+            self._all_catalogs = {
+                person_id: self.person_catalog(processor, index, person_id, role_names)
+                for person_id in index.person_ids.tolist()
+            }
+        return self._all_catalogs
+
+    def cached_catalog(self, person_id):
+        """已批量计算时返回缓存的分组结果，否则返回 None"""
+        if self._all_catalogs is None:
+            return None
+        return self._all_catalogs.get(person_id, ([], {}, []))
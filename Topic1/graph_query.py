@@ -0,0 +1,222 @@
+"""
+路径模式查询
+用节点步 / 边步交替组成的模式描述一条路径，例如
+    Person -[角色]-> Song/Album(Oceanus Folk) <-[CoverOf]- Song(notable)
+写作
+    processor.query(Node('Person'), Edge(ROLE_EDGE_TYPES),
+                    Node(('Song', 'Album'), genre='Oceanus Folk'),
+                    Edge('CoverOf', direction='in'), Node('Song', notable=True))
+执行计划：
+    1. 每个节点步的属性条件在列式存储上向量化求出候选掩码
+    2. 以候选最少（最有选择性）的节点步为起点
+    3. 每次向左或向右扩展一步（优先扩展候选更少的一侧），
+       在 (节点, 边类型) 分区的CSR数组上成批取邻居，再用下一节点步的掩码过滤
+结果是对齐的序号数组，可取为节点ID矩阵，或按起点分块以生成器逐行产出。
+平行边会产生重复路径（与逐层嵌套循环的结果一致），需要时用 distinct=True 去重。
+"""
+import numpy as np
+
+
+class Node:
+    """节点步：node_type / genre / notable / years 走列式掩码，ids 限定节点ID，
+    where 为任意 node_dict -> bool 的附加条件（对每个不同节点只求值一次）
+    """
+
+    def __init__(self, node_type=None, genre=None, notable=None, years=None,
+                 year_field='release_date', ids=None, where=None):
+        self.filters = {
+            name: value for name, value in (
+                ('node_type', node_type), ('genre', genre),
+                ('notable', notable), ('years', years),
+            ) if value is not None
+        }
+        if years is not None:
+            self.filters['year_field'] = year_field
+        self.ids = ids
+        self.where = where
+
+    @property
+    def constrained(self):
+        return bool(self.filters) or self.ids is not None or self.where is not None
+
+    def __repr__(self):
+        parts = [f'{k}={v!r}' for k, v in self.filters.items()]
+        if self.ids is not None:
+            parts.append(f'ids=<{len(self.ids)}>')
+        if self.where is not None:
+            parts.append('where=...')
+        return f"Node({', '.join(parts)})"
+
+
+class Edge:
+    """边步：edge_types 为空表示任意类型；direction='out' 表示从左侧节点指向右侧节点"""
+
+    def __init__(self, edge_types=None, direction='out'):
+        if direction not in ('out', 'in'):
+            raise ValueError(f"direction 只能是 'out' 或 'in': {direction}")
+        if isinstance(edge_types, str):
+            edge_types = (edge_types,)
+        self.edge_types = tuple(edge_types) if edge_types is not None else None
+        self.direction = direction
+
+    def __repr__(self):
+        arrow = '->' if self.direction == 'out' else '<-'
+        return f"Edge({arrow} {list(self.edge_types) if self.edge_types else '*'})"
+
+
+class PathResult:
+    """查询结果：ordinals[i, k] 为第 i 条路径上第 k 个节点步的节点序号"""
+
+    def __init__(self, graph, ordinals):
+        self.graph = graph
+        self.ordinals = ordinals
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def ids(self):
+        """(路径数, 节点步数) 的节点ID矩阵"""
+        return self.graph.node_ids[self.ordinals]
+
+    def column(self, step, unique=False):
+        """第 step 个节点步的节点ID数组；unique 时按首次出现顺序去重"""
+        ordinals = self.ordinals[:, step]
+        if unique:
+            _, first = np.unique(ordinals, return_index=True)
+            ordinals = ordinals[np.sort(first)]
+        return self.graph.node_ids[ordinals]
+
+    def rows(self):
+        """逐条产出节点ID元组"""
+        for row in self.ids().tolist():
+            yield tuple(row)
+
+
+class PathQuery:
+    """路径模式查询，由 MusicGraphProcessor.query() 创建"""
+
+    def __init__(self, graph, columns, get_node, steps, distinct=False):
+        steps = list(steps)
+        if not steps or len(steps) % 2 == 0:
+            raise ValueError("路径模式必须以节点步开始和结束，节点步与边步交替")
+        for i, step in enumerate(steps):
+            expected = Node if i % 2 == 0 else Edge
+            if not isinstance(step, expected):
+                raise ValueError(f"第 {i} 步应为 {expected.__name__}，实际为 {step!r}")
+        self.graph = graph
+        self.columns = columns
+        self.get_node = get_node
+        self.nodes = steps[0::2]
+        self.edges = steps[1::2]
+        self.distinct = distinct
+        self._masks = [None] * len(self.nodes)
+        self._where_cache = [{} for _ in self.nodes]
+
+    def candidates(self, k):
+        """第 k 个节点步的候选掩码（长度为图的节点数）"""
+        if self._masks[k] is None:
+            step = self.nodes[k]
+            n = self.graph.num_nodes
+            mask = np.ones(n, dtype=bool)
+            if step.filters:
+                # 字典后端的图在节点之外还可能有只出现在边里的端点，它们没有属性
+                mask[:] = False
+                m = min(n, self.columns.num_nodes)
+                mask[:m] = self.columns.mask(**step.filters)[:m]
+            if step.ids is not None:
+                ordinal_of = self.graph.ordinal_of
+                wanted = [ordinal_of[i] for i in step.ids if i in ordinal_of]
+                in_ids = np.zeros(n, dtype=bool)
+                in_ids[wanted] = True
+                mask &= in_ids
+            self._masks[k] = mask
+        return self._masks[k]
+
+    def plan(self):
+        """执行计划：(起点节点步, [(从, 到, 边步序号, 是否沿模式方向), ...])"""
+        counts = [int(self.candidates(k).sum()) for k in range(len(self.nodes))]
+        anchor = int(np.argmin(counts))
+        left = right = anchor
+        hops = []
+        while left > 0 or right < len(self.nodes) - 1:
+            go_right = left == 0 or (right < len(self.nodes) - 1
+                                     and counts[right + 1] <= counts[left - 1])
+            if go_right:
+                hops.append((right, right + 1, right, True))
+                right += 1
+            else:
+                hops.append((left, left - 1, left - 1, False))
+                left -= 1
+        return anchor, hops
+
+    def explain(self):
+        """可读的执行计划"""
+        anchor, hops = self.plan()
+        lines = [f"start  {self.nodes[anchor]!r}  候选 {int(self.candidates(anchor).sum())}"]
+        for src, dst, e, forward in hops:
+            lines.append(f"join   [{src}] {self.edges[e]!r}{'' if forward else ' (反向)'} -> "
+                         f"[{dst}] {self.nodes[dst]!r}  候选 {int(self.candidates(dst).sum())}")
+        return '\n'.join(lines)
+
+    def _expand(self, frontier, edge, forward):
+        """frontier 中每个节点沿边步取邻居，返回 (frontier 行号, 邻居序号)，每行内按原始边顺序"""
+        direction = edge.direction
+        if not forward:
+            direction = 'in' if direction == 'out' else 'out'
+        rows, found, _, _ = self.graph.expand(frontier, edge.edge_types, direction)
+        return rows, found
+
+    def _apply_where(self, k, ordinals):
+        step = self.nodes[k]
+        cache = self._where_cache[k]
+        node_ids = self.graph.node_ids
+        keep = np.empty(len(ordinals), dtype=bool)
+        for i, ordinal in enumerate(ordinals.tolist()):
+            ok = cache.get(ordinal)
+            if ok is None:
+                node = self.get_node(int(node_ids[ordinal]))
+                ok = cache[ordinal] = bool(node is not None and step.where(node))
+            keep[i] = ok
+        return keep
+
+    def _run(self, anchor_ordinals, anchor, hops):
+        columns = {anchor: anchor_ordinals}
+        if self.nodes[anchor].where is not None:
+            columns[anchor] = anchor_ordinals[self._apply_where(anchor, anchor_ordinals)]
+        for src, dst, e, forward in hops:
+            rows, found = self._expand(columns[src], self.edges[e], forward)
+            keep = self.candidates(dst)[found]
+            if self.nodes[dst].where is not None:
+                keep[keep] = self._apply_where(dst, found[keep])
+            rows = rows[keep]
+            columns = {k: v[rows] for k, v in columns.items()}
+            columns[dst] = found[keep]
+            if not len(rows):
+                break
+        k = len(self.nodes)
+        if len(columns) < k:
+            return np.empty((0, k), dtype=np.int32)
+        ordinals = np.column_stack([columns[i] for i in range(k)]).astype(np.int32)
+        if self.distinct and len(ordinals):
+            _, first = np.unique(ordinals, axis=0, return_index=True)
+            ordinals = ordinals[np.sort(first)]
+        return ordinals
+
+    def run(self):
+        """执行查询，返回 PathResult"""
+        anchor, hops = self.plan()
+        start = np.flatnonzero(self.candidates(anchor))
+        return PathResult(self.graph, self._run(start, anchor, hops))
+
+    def iter_rows(self, chunk_size=4096):
+        """按起点分块执行，逐条产出节点ID元组（内存占用与单块结果成正比）
+        distinct=True 时只在块内去重
+        """
+        anchor, hops = self.plan()
+        start = np.flatnonzero(self.candidates(anchor))
+        for lo in range(0, len(start), chunk_size):
+            result = PathResult(self.graph, self._run(start[lo:lo + chunk_size], anchor, hops))
+            yield from result.rows()
+
+    def count(self):
+        return len(self.run())
@@ -0,0 +1,44 @@
+"""
+多进程共享的只读图
+主进程用 MusicGraphProcessor.publish_shared() 把索引发布为快照目录（每个数组一个 .npy），
+工作进程用 attach() 以只读 mmap 打开：数组页由操作系统页缓存在进程间共享，
+工作进程既不解析 JSON，也不需要从主进程 pickle 整个处理器，启动开销与额外内存都接近零。
+
+    shared_dir = processor.publish_shared()
+    with shared_pool(shared_dir, workers=4) as pool:
+        results = pool.map(evaluate_one, person_ids)
+
+    def evaluate_one(person_id):          # 模块级函数，在工作进程中执行
+        return Task1_PersonEvaluation(worker_processor()).evaluate_person(person_id)
+"""
+import contextlib
+import io
+import multiprocessing
+
+_worker_processor = None
+
+
+def attach(shared_dir):
+    """在当前进程中打开共享快照，返回只读的 MusicGraphProcessor"""
+    from data_preprocessing import MusicGraphProcessor
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return MusicGraphProcessor.attach(shared_dir)
+
+
+def init_worker(shared_dir):
+    """进程池 initializer：每个工作进程打开一次共享快照"""
+    global _worker_processor
+    _worker_processor = attach(shared_dir)
+
+
+def worker_processor():
+    """工作进程中已打开的处理器"""
+    if _worker_processor is None:
+        raise RuntimeError("当前进程未打开共享图，请通过 shared_pool() 或 init_worker() 初始化")
+    return _worker_processor
+
+
+def shared_pool(shared_dir, workers=None):
+    """创建进程池，每个工作进程启动时 attach 到 shared_dir"""
+    return multiprocessing.Pool(workers, initializer=init_worker, initargs=(str(shared_dir),))
@@ -0,0 +1,71 @@
+"""
+子图切片
+按流派 / 年份 / 节点类型选出种子节点，可再向外扩展 k 跳邻居，取这些节点上的诱导子图，
+生成与 Topic1_graph.json 同格式的文档（nodes / links），可直接构造新的处理器或写成较小的图文件。
+"""
+import json
+
+import numpy as np
+
+from graph_ego import ego_sweep
+
+DEFAULT_HEADER = {'directed': True, 'multigraph': True, 'graph': {}}
+
+
+def slice_ordinals(processor, genres=None, years=None, node_types=None, include_neighbors=0,
+                   year_field='release_date'):
+    """切片包含的节点序号（升序，即原始节点顺序），序号基于 processor._query_graph()"""
+    graph = processor._query_graph()
+    columns = processor.columns
+    seeds = np.zeros(graph.num_nodes, dtype=bool)
+    m = min(graph.num_nodes, columns.num_nodes)
+    seeds[:m] = columns.mask(node_type=node_types, genre=genres, years=years,
+                             year_field=year_field)[:m]
+    ordinals = np.flatnonzero(seeds)
+    if include_neighbors:
+        ordinals = ego_sweep(graph, [ordinals], hops=include_neighbors).nodes
+    return np.sort(ordinals)
+
+
+def slice_document(processor, ordinals=None):
+    """诱导子图文档：节点按原始顺序；有原始文档时保留原始边字典（含 key 等属性）与边顺序
+    ordinals 缺省为全部节点
+    """
+    graph = processor._query_graph()
+    if ordinals is None:
+        ordinals = np.arange(graph.num_nodes)
+    member = np.zeros(graph.num_nodes, dtype=bool)
+    member[ordinals] = True
+    node_ids = graph.node_ids
+    get_node = processor.get_node
+    nodes = [node for node in (get_node(i) for i in node_ids[ordinals].tolist()) if node is not None]
+
+    data = getattr(processor, 'data', None)
+    if data is not None:
+        header = {k: v for k, v in data.items() if k not in ('nodes', 'links')}
+        ids = set(node_ids[ordinals].tolist())
+        links = [link for link in data['links'] if link['source'] in ids and link['target'] in ids]
+    else:
+        header = dict(DEFAULT_HEADER)
+        src, dst, types = graph.edge_arrays()
+        inside = member[src] & member[dst]
+        names = graph.edge_type_names
+        keys = {}
+        links = []
+        for s, t, c in zip(node_ids[src[inside]].tolist(), node_ids[dst[inside]].tolist(),
+                           types[inside].tolist()):
+            # 多重图中同一 (source, target) 的平行边依次编号
+            key = keys.get((s, t), 0)
+            keys[(s, t)] = key + 1
+            links.append({'source': s, 'target': t, 'Edge Type': names[c], 'key': key})
+    document = dict(header)
+    document['nodes'] = nodes
+    document['links'] = links
+    return document
+
+
+def write_document(document, path):
+    """写出图文件（紧凑JSON）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, separators=(',', ':'))
+    return path
@@ -0,0 +1,185 @@
+"""
+索引快照缓存
+把构建好的CSR索引、节点属性列、音乐人×作品关联索引和节点数据存成一个目录
+（每个数组一个 .npy 文件 + meta.json），之后的加载直接 mmap，无需重新解析 JSON。
+影响力计数表与共同署名矩阵也一并写入，加载（含多进程 attach）后不再重建。
+快照以源文件的 大小 / mtime / 内容哈希 为键，源文件变化后自动失效。
+"""
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+SNAPSHOT_VERSION = 7
+META_FILE = 'meta.json'
+
+
+def default_snapshot_dir(json_file):
+    """默认快照目录：与图文件同目录，Topic1_graph.json -> Topic1_graph.snapshot/"""
+    path = Path(json_file)
+    return path.with_name(path.stem + '.snapshot')
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """计算文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def graph_fingerprint(path, with_hash=True):
+    """源文件指纹：大小、mtime（纳秒）与可选的内容哈希"""
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        fingerprint['sha256'] = file_hash(path)
+    return fingerprint
+
+
+def read_meta(snapshot_dir):
+    meta_path = Path(snapshot_dir) / META_FILE
+    if not meta_path.exists():
+        return None
+    try:
+        with meta_path.open('r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def snapshot_is_fresh(snapshot_dir, json_file):
+    """判断快照是否与源文件一致
+    大小+mtime 一致直接认为有效；大小一致但 mtime 变了（如被复制/touch）再比对哈希
+    """
+    meta = read_meta(snapshot_dir)
+    if not meta or meta.get('version') != SNAPSHOT_VERSION:
+        return False
+    saved = meta.get('source', {})
+    current = graph_fingerprint(json_file, with_hash=False)
+    if saved.get('size') != current['size']:
+        return False
+    if saved.get('mtime_ns') == current['mtime_ns']:
+        return True
+    if saved.get('sha256') != file_hash(json_file):
+        return False
+    # 内容未变，记下新的 mtime，下次无需再算哈希
+    saved['mtime_ns'] = current['mtime_ns']
+    try:
+        with (Path(snapshot_dir) / META_FILE).open('w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
+    return True
+
+
+def save_snapshot(snapshot_dir, json_file, arrays, meta):
+    """写入快照：先写临时目录再整体替换，避免留下半成品"""
+    snapshot_dir = Path(snapshot_dir)
+    tmp_dir = snapshot_dir.with_name(snapshot_dir.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    for name, arr in arrays.items():
+        np.save(tmp_dir / f'{name}.npy', np.ascontiguousarray(arr))
+
+    meta = dict(meta)
+    meta['version'] = SNAPSHOT_VERSION
+    meta['source'] = graph_fingerprint(json_file) if json_file else {}
+    meta['arrays'] = sorted(arrays)
+    with (tmp_dir / META_FILE).open('w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    if snapshot_dir.exists():
+        shutil.rmtree(snapshot_dir)
+    tmp_dir.rename(snapshot_dir)
+    return snapshot_dir
+
+
+def load_snapshot(snapshot_dir):
+    """以只读 mmap 方式打开快照，返回 (arrays, meta)"""
+    snapshot_dir = Path(snapshot_dir)
+    meta = read_meta(snapshot_dir)
+    arrays = {
+        name: np.load(snapshot_dir / f'{name}.npy', mmap_mode='r')
+        for name in meta['arrays']
+    }
+    return arrays, meta
+
+
+def encode_nodes(nodes):
+    """把节点字典序列化为 (uint8 字节块, int64 偏移)，每个节点一段 JSON"""
+    chunks = [json.dumps(node, ensure_ascii=False).encode('utf-8') for node in nodes]
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in chunks], out=offsets[1:])
+    blob = np.frombuffer(b''.join(chunks), dtype=np.uint8)
+    return blob, offsets
+
+
+class NodeStore(Mapping):
+    """节点ID -> 节点字典的只读映射，按需从快照字节块解码并缓存"""
+
+    def __init__(self, node_ids, ordinal_of, blob, offsets):
+        self._node_ids = node_ids
+        self._ordinal_of = ordinal_of
+        self._blob = blob
+        self._offsets = offsets
+        self._cache = {}
+
+    def node_at(self, ordinal):
+        node_id = self._node_ids[ordinal]
+        node = self._cache.get(node_id)
+        if node is None:
+            lo, hi = self._offsets[ordinal], self._offsets[ordinal + 1]
+            node = json.loads(self._blob[lo:hi].tobytes().decode('utf-8'))
+            self._cache[node_id] = node
+        return node
+
+    def __getitem__(self, node_id):
+        ordinal = self._ordinal_of.get(node_id)
+        if ordinal is None or ordinal >= len(self._offsets) - 1:
+            raise KeyError(node_id)
+        return self.node_at(ordinal)
+
+    def __contains__(self, node_id):
+        ordinal = self._ordinal_of.get(node_id)
+        return ordinal is not None and ordinal < len(self._offsets) - 1
+
+    def __iter__(self):
+        return iter(self._node_ids[:len(self)])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+class NodeTypeIndex(Mapping):
+    """节点类型 -> 节点字典列表，按类型首次访问时解码"""
+
+    def __init__(self, store, type_names, type_codes):
+        self._store = store
+        self._type_names = list(type_names)
+        self._type_codes = type_codes
+        self._lists = {}
+
+    def __getitem__(self, node_type):
+        if node_type not in self._type_names:
+            raise KeyError(node_type)
+        nodes = self._lists.get(node_type)
+        if nodes is None:
+            code = self._type_names.index(node_type)
+            ordinals = np.flatnonzero(self._type_codes == code).tolist()
+            nodes = [self._store.node_at(i) for i in ordinals]
+            self._lists[node_type] = nodes
+        return nodes
+
+    def __iter__(self):
+        return iter(self._type_names)
+
+    def __len__(self):
+        return len(self._type_names)
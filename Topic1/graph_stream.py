@@ -0,0 +1,96 @@
+"""
+流式JSON读取
+逐条解析图文件中的 nodes / links 数组元素，不把整个文档读入内存。
+只依赖标准库：分块读取文本，用 json.JSONDecoder.raw_decode 逐个解码数组元素。
+"""
+import json
+import re
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = re.compile(r'\s*')
+
+
+class _StreamReader:
+    """带缓冲区的文本读取器，已消费的部分在补充数据时丢弃"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        more = self._f.read(self._chunk_size)
+        if not more:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + more
+        self.pos = 0
+
+    def peek(self):
+        """跳过空白并返回下一个字符（文件结束返回空串）"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, ch):
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"JSON格式错误：期望 {ch!r}，实际为 {found!r}（偏移 {self.pos}）")
+        self.pos += 1
+
+    def value(self):
+        """解码下一个完整的JSON值；缓冲区不够时继续读取"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # 值恰好在缓冲区末尾（如被截断的数字），补充数据后重新解码
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_graph_items(json_file, sections=('nodes', 'links')):
+    """按文件中的出现顺序逐条产出 (section, item)，section 为 'nodes' 或 'links'
+    顶层其他键（directed / multigraph / graph 等）被跳过
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key in sections and reader.peek() == '[':
+                reader.pos += 1
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield key, reader.value()
+                        sep = reader.peek()
+                        reader.pos += 1
+                        if sep == ']':
+                            break
+                        if sep != ',':
+                            raise ValueError(f"JSON格式错误：{key} 数组中出现 {sep!r}")
+            else:
+                reader.value()
+            sep = reader.peek()
+            reader.pos += 1
+            if sep == '}':
+                return
+            if sep != ',':
+                raise ValueError(f"JSON格式错误：顶层对象中出现 {sep!r}")
@@ -0,0 +1,114 @@
+"""
+流派 × 年份 时间线立方体
+一次扫描全部 Song / Album 节点，得到稠密计数数组 counts[流派, 年份, 指标]，
+指标为 (total, notable, songs, albums)；年份为发行年份（RELEASE_DATE_ONLY），缺失（及 0）不计。
+作品本身按 (流派, 年份, 类型, 节点顺序) 排成一列并记录区间，
+任一流派（或全部流派）的时间线都只是对计数与作品区间的切片读取。
+"""
+import numpy as np
+
+MEASURES = ('total', 'notable', 'songs', 'albums')
+
+
+def _offsets(keys, size):
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets
+
+
+class GenreTimelineCube:
+    """counts 形状为 (流派数, 年份数, 4)，第 j 个年份为 year_min + j；genres 为排序后的流派列表"""
+
+    def __init__(self, genres, year_min, counts, works, members, member_offsets,
+                 year_members, year_member_offsets):
+        self.genres = list(genres)
+        self.genre_index = {g: i for i, g in enumerate(self.genres)}
+        self.year_min = year_min
+        self.counts = counts
+        self._works = works                             # 作品节点（Song 在前，Album 在后）
+        self._members = members                         # 按 (流派, 年份, 类型, 节点顺序) 排列的作品位置
+        self._member_offsets = member_offsets           # 每个 (流派, 年份, 类型) 的区间
+        self._year_members = year_members               # 按 (年份, 类型, 节点顺序) 排列（全部流派视图）
+        self._year_member_offsets = year_member_offsets
+
+    @classmethod
+    def build(cls, processor, year_priority):
+        """year_priority: 取年份的日期字段优先级（任务2 为 RELEASE_DATE_ONLY）"""
+        songs = processor.get_nodes_by_type('Song')
+        albums = processor.get_nodes_by_type('Album')
+        works = songs + albums
+        work_genres = [work.get('genre') for work in works]
+        genres = sorted({g for g in work_genres if g})
+        genre_index = {g: i for i, g in enumerate(genres)}
+
+        genre = np.array([genre_index[g] if g else -1 for g in work_genres], dtype=np.int64)
+        years = processor.get_years([work['id'] for work in works], year_priority).astype(np.int64)
+        notable = np.array([bool(work.get('notable')) for work in works], dtype=bool)
+        kind = (np.arange(len(works)) >= len(songs)).astype(np.int64)     # 0 = Song, 1 = Album
+        keep = np.flatnonzero((genre >= 0) & (years > 0))
+
+        year_min = int(years[keep].min()) if len(keep) else 0
+        num_years = int(years[keep].max()) - year_min + 1 if len(keep) else 0
+        g, y, k = genre[keep], years[keep] - year_min, kind[keep]
+        cell = g * num_years + y
+        num_cells = len(genres) * num_years
+        counts = np.zeros((len(genres), num_years, len(MEASURES)), dtype=np.int64)
+        flat = counts.reshape(num_cells, len(MEASURES))
+        flat[:, 0] = np.bincount(cell, minlength=num_cells)
+        flat[:, 1] = np.bincount(cell[notable[keep]], minlength=num_cells)
+        flat[:, 2] = np.bincount(cell[k == 0], minlength=num_cells)
+        flat[:, 3] = np.bincount(cell[k == 1], minlength=num_cells)
+
+        # keep 已按节点顺序递增，稳定排序即保持同一区间内的节点顺序
+        order = np.argsort(cell * 2 + k, kind='stable')
+        year_order = np.argsort(y * 2 + k, kind='stable')
+        return cls(genres, year_min, counts, works,
+                   keep[order], _offsets(cell * 2 + k, num_cells * 2),
+                   keep[year_order], _offsets(y * 2 + k, num_years * 2))
+
+    @property
+    def years(self):
+        return np.arange(self.year_min, self.year_min + self.counts.shape[1])
+
+    def slice(self, genre=None):
+        """(年份数, 4) 的计数切片；genre 为空时为全部流派之和，未知流派全为 0"""
+        if not genre:
+            return self.counts.sum(axis=0)
+        g = self.genre_index.get(genre)
+        if g is None:
+            return np.zeros(self.counts.shape[1:], dtype=self.counts.dtype)
+        return self.counts[g]
+
+    def works(self, genre, year, kind):
+        """某 (流派, 年份) 的作品节点列表（kind 为 'songs' 或 'albums'，按节点顺序）；genre 为空时取全部流派"""
+        j = year - self.year_min
+        k = MEASURES.index(kind) - 2
+        if not 0 <= j < self.counts.shape[1]:
+            return []
+        if not genre:
+            cell = j * 2 + k
+            lo, hi = self._year_member_offsets[cell], self._year_member_offsets[cell + 1]
+            positions = self._year_members[lo:hi]
+        else:
+            g = self.genre_index.get(genre)
+            if g is None:
+                return []
+            cell = (g * self.counts.shape[1] + j) * 2 + k
+            lo, hi = self._member_offsets[cell], self._member_offsets[cell + 1]
+            positions = self._members[lo:hi]
+        return [self._works[i] for i in positions.tolist()]
+
+    def timeline(self, genre=None):
+        """[(年份, {'total', 'notable', 'songs': [节点], 'albums': [节点]}), ...]，只含有作品的年份，按年份升序"""
+        counts = self.slice(genre)
+        result = []
+        for j in np.flatnonzero(counts[:, 0]).tolist():
+            year = self.year_min + j
+            total, notable = counts[j, 0].item(), counts[j, 1].item()
+            result.append((year, {
+                'total': total,
+                'notable': notable,
+                'songs': self.works(genre, year, 'songs'),
+                'albums': self.works(genre, year, 'albums'),
+            }))
+        return result
@@ -0,0 +1,212 @@
+"""
+音乐人 × 流派 占比矩阵
+任务1的 genre_share 以稠密 float64 数组存放（与评估结果中的占比逐位一致；
+只在内存中使用时可传 dtype=np.float32 减半占用）：行为音乐人（person_ids），列为流派（genres）。
+保存为 .npy（矩阵）+ 同名 .axes.json（行/列坐标轴与姓名、评分），或单个 parquet 文件；
+CSV 只是由数组一次性渲染出的可选导出，不再逐人读取 genre_share 字典。
+label_sweep 在同一矩阵上一次算出多个阈值下的流派标签（位集）及各流派人数。
+"""
+import csv
+import json
+from pathlib import Path
+
+import numpy as np
+
+CSV_FLOAT_FORMAT = '%.9g'   # float32 矩阵导出时可逐位还原的有效位数（float64 按 repr 写出）
+
+
+def axes_path(path):
+    """矩阵文件的坐标轴文件：person_genre_matrix.npy -> person_genre_matrix.axes.json"""
+    path = Path(path)
+    return path.with_name(path.stem + '.axes.json')
+
+
+class PersonGenreMatrix:
+    """shares[i, j] 为 person_ids[i] 在 genres[j] 上的作品占比"""
+
+    def __init__(self, person_ids, genres, shares, names=None, stage_names=None, scores=None,
+                 dtype=np.float64):
+        self.person_ids = np.asarray(person_ids, dtype=np.int64)
+        self.genres = list(genres)
+        self.shares = np.asarray(shares, dtype=dtype)
+        num_rows = len(self.person_ids)
+        self.names = list(names) if names is not None else [None] * num_rows
+        self.stage_names = list(stage_names) if stage_names is not None else [None] * num_rows
+        self.scores = (np.asarray(scores, dtype=np.float64) if scores is not None
+                       else np.zeros(num_rows, dtype=np.float64))
+        self.row_of = {pid: i for i, pid in enumerate(self.person_ids.tolist())}
+        self.genre_index = {g: j for j, g in enumerate(self.genres)}
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    @classmethod
+    def from_evaluations(cls, evaluations, genres, dtype=np.float64):
+        """由 evaluate_person 形式的结果字典构造（缺失的流派记 0）"""
+        shares = np.zeros((len(evaluations), len(genres)), dtype=dtype)
+        for i, ev in enumerate(evaluations):
+            share_map = ev.get('genre_share', {})
+            shares[i] = [share_map.get(g, 0.0) for g in genres]
+        return cls([ev.get('person_id') for ev in evaluations], genres, shares,
+                   names=[ev.get('name') for ev in evaluations],
+                   stage_names=[ev.get('stage_name') for ev in evaluations],
+                   scores=[ev.get('score', 0) for ev in evaluations], dtype=dtype)
+
+    def share_of(self, person_id):
+        """流派 -> 占比；不在矩阵中的音乐人返回空字典"""
+        row = self.row_of.get(person_id)
+        if row is None:
+            return {}
+        return dict(zip(self.genres, self.shares[row].tolist()))
+
+    def column(self, genre):
+        """某流派的占比列（与 person_ids 对齐）"""
+        return self.shares[:, self.genre_index[genre]]
+
+    def patched(self, updates, order):
+        """行级更新：updates（PersonGenreMatrix，列须相同）中的行替换或新增，
+        其余行保留原值；返回按 order（person_id 序列）排列的新矩阵，不在 order 中的行被丢弃
+        """
+        if updates.genres != self.genres:
+            raise ValueError("更新行的流派列与矩阵不一致")
+        order = [int(pid) for pid in order]
+        # 每个输出行的来源：(是否取自 updates, 行号)
+        sources = [(True, updates.row_of[pid]) if pid in updates.row_of else (False, self.row_of[pid])
+                   for pid in order]
+        from_update = np.array([u for u, _ in sources], dtype=bool)
+        rows = np.array([r for _, r in sources], dtype=np.int64)
+        shares = np.empty((len(order), len(self.genres)), dtype=self.shares.dtype)
+        shares[~from_update] = np.asarray(self.shares)[rows[~from_update]]
+        shares[from_update] = np.asarray(updates.shares)[rows[from_update]]
+
+        def pick(old, new):
+            return [new[r] if u else old[r] for u, r in sources]
+
+        return PersonGenreMatrix(order, self.genres, shares,
+                                 names=pick(self.names, updates.names),
+                                 stage_names=pick(self.stage_names, updates.stage_names),
+                                 scores=pick(self.scores.tolist(), updates.scores.tolist()),
+                                 dtype=self.shares.dtype)
+
+    def label_sweep(self, thresholds, fallback_top=True):
+        """多阈值流派标签（占比 >= 阈值；fallback_top 时无达标流派取占比最高的一个，需 > 0），
+        全部阈值一次向量化计算。阈值转为矩阵的数据类型后比较，
+        float64 矩阵（缺省）的标签与 Task1.assign_genre_labels 逐位相同
+        """
+        thresholds = [float(t) for t in thresholds]
+        shares = np.asarray(self.shares)
+        limits = np.asarray(thresholds, dtype=shares.dtype)
+        hits = shares[None, :, :] >= limits[:, None, None]      # 阈值 × 音乐人 × 流派
+        if fallback_top and shares.size:
+            top = shares.argmax(axis=1)     # 与 max() 相同，并列时取第一个
+            rows = np.arange(len(self))
+            positive = shares[rows, top] > 0
+            for t in range(len(thresholds)):
+                empty = np.flatnonzero(~hits[t].any(axis=1) & positive)
+                hits[t, empty, top[empty]] = True
+        return GenreLabelSweep(thresholds, self.person_ids, self.genres,
+                               np.packbits(hits, axis=2, bitorder='little'),
+                               hits.sum(axis=1))
+
+    def save(self, path):
+        """按后缀保存：.parquet 写单个表（需要 pandas + pyarrow），其余写 .npy + .axes.json"""
+        path = Path(path)
+        if path.suffix == '.parquet':
+            self.to_frame().to_parquet(path, index=False)
+            return path
+        np.save(path, self.shares)
+        with axes_path(path).open('w', encoding='utf-8') as f:
+            json.dump({
+                'person_ids': self.person_ids.tolist(),
+                'genres': self.genres,
+                'names': self.names,
+                'stage_names': self.stage_names,
+                'scores': self.scores.tolist(),
+            }, f, ensure_ascii=False)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        path = Path(path)
+        if path.suffix == '.parquet':
+            import pandas as pd
+
+            frame = pd.read_parquet(path)
+            genres = [c for c in frame.columns if c not in ('person_id', 'name', 'stage_name', 'score')]
+            return cls(frame['person_id'].to_numpy(), genres, frame[genres].to_numpy(np.float64),
+                       names=frame['name'].tolist(), stage_names=frame['stage_name'].tolist(),
+                       scores=frame['score'].to_numpy())
+        shares = np.load(path, mmap_mode='r' if mmap else None)
+        with axes_path(path).open('r', encoding='utf-8') as f:
+            axes = json.load(f)
+        return cls(axes['person_ids'], axes['genres'], shares, names=axes.get('names'),
+                   stage_names=axes.get('stage_names'), scores=axes.get('scores'),
+                   dtype=shares.dtype)
+
+    def to_frame(self):
+        """转为 pandas.DataFrame（需要安装 pandas）"""
+        import pandas as pd
+
+        frame = pd.DataFrame(self.shares, columns=self.genres)
+        frame.insert(0, 'person_id', self.person_ids)
+        frame.insert(1, 'name', self.names)
+        frame.insert(2, 'stage_name', self.stage_names)
+        frame.insert(3, 'score', self.scores)
+        return frame
+
+    def to_csv(self, path):
+        """导出CSV：person_id, name 后接各流派占比
+        float64 矩阵按 repr 写出（与逐人写 genre_share 字典的结果相同），float32 矩阵一次性格式化为字符串矩阵
+        """
+        if self.shares.dtype == np.float64:
+            cells = np.asarray(self.shares)
+        else:
+            cells = np.char.mod(CSV_FLOAT_FORMAT, self.shares)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            w = csv.writer(f)
+            w.writerow(['person_id', 'name'] + self.genres)
+            w.writerows([pid, name, *row] for pid, name, row
+                        in zip(self.person_ids.tolist(), self.names, cells.tolist()))
+        return path
+
+
+class GenreLabelSweep:
+    """label_sweep 的结果
+    bits[t, i] 为 person_ids[i] 在 thresholds[t] 下的标签位集（第 j 位对应 genres[j]，小端字节序）；
+    counts[t, j] 为 thresholds[t] 下带 genres[j] 标签的人数
+    """
+
+    def __init__(self, thresholds, person_ids, genres, bits, counts):
+        self.thresholds = list(thresholds)
+        self.person_ids = person_ids
+        self.genres = list(genres)
+        self.bits = bits
+        self.counts = counts
+        self.row_of = {pid: i for i, pid in enumerate(person_ids.tolist())}
+
+    def _threshold_index(self, threshold):
+        return self.thresholds.index(float(threshold))
+
+    def mask(self, threshold):
+        """某阈值下的 音乐人 × 流派 布尔矩阵"""
+        t = self._threshold_index(threshold)
+        return np.unpackbits(self.bits[t], axis=1, count=len(self.genres),
+                             bitorder='little').astype(bool)
+
+    def labels(self, threshold, person_id):
+        """某阈值下该音乐人的标签（按 genres 顺序）；不在矩阵中时为空列表"""
+        row = self.row_of.get(person_id)
+        if row is None:
+            return []
+        t = self._threshold_index(threshold)
+        hits = np.unpackbits(self.bits[t, row], count=len(self.genres), bitorder='little')
+        return [self.genres[j] for j in np.flatnonzero(hits).tolist()]
+
+    def genre_counts(self, threshold):
+        """流派 -> 某阈值下的标签人数"""
+        return dict(zip(self.genres, self.counts[self._threshold_index(threshold)].tolist()))
+
+    def labeled_counts(self):
+        """每个阈值下至少有一个标签的人数"""
+        any_bit = (self.bits != 0).any(axis=2)
+        return dict(zip(self.thresholds, any_bit.sum(axis=1).tolist()))
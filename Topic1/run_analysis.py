@@ -30,7 +30,7 @@ def run_analysis():
     print("="*80)
     
     # 初始化数据处理器
-    processor = MusicGraphProcessor('Topic1_graph.json')
+    processor = MusicGraphProcessor('Topic1_graph.json', snapshot=True)
     
     # 任务1：评估音乐人表现（示例）
     print("\n" + "="*80)
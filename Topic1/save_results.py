@@ -10,29 +10,23 @@ from task_analysis import Task1_PersonEvaluation, Task2_GenreAnalysis, Task3_Oce
 # 设置环境变量
 os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-def save_results():
-    """保存所有分析结果"""
+def save_results(export_csv=False):
+    """保存所有分析结果
+    export_csv: 额外导出 person_genre_matrix.csv（由占比矩阵渲染）
+    """
     print("="*80)
     print("保存分析结果")
     print("="*80)
     
     # 初始化
-    processor = MusicGraphProcessor('Topic1_graph.json')
+    processor = MusicGraphProcessor('Topic1_graph.json', snapshot=True)
     
     # 任务1：评估音乐人（评估全部音乐人）
     print("\n任务1：评估音乐人表现（全部音乐人）...")
     task1 = Task1_PersonEvaluation(processor)
-    persons = processor.get_nodes_by_type('Person')
-    evaluations = []
-    for i, person in enumerate(persons):
-        if (i + 1) % 500 == 0:
-            print(f"    已处理 {i+1}/{len(persons)}...")
-        evaluation = task1.evaluate_person(person['id'])
-        if evaluation:
-            evaluations.append(evaluation)
-    
-    # 按评分排序
-    evaluations.sort(key=lambda x: x['score'], reverse=True)
+    # 批量评估，结果与逐个 evaluate_person 后按评分排序完全一致
+    table = task1.evaluate_batch()
+    evaluations = table.to_records(sort=True)
     
     print(f"  完成！共评估 {len(evaluations)} 个音乐人")
     
@@ -44,8 +38,13 @@ def save_results():
         json.dump(labeled_evaluations, f, ensure_ascii=False, indent=2)
     print("  ✓ 已保存到 person_evaluations_labeled.json")
 
-    matrix_csv = task1.export_person_genre_matrix(labeled_evaluations, 'person_genre_matrix.csv')
-    print(f"  ✓ 已导出 {matrix_csv}")
+    # 占比矩阵直接取自批量评估的 genre_share 列（float64，数值与行顺序都与上面的JSON一致）
+    genre_matrix = table.genre_share_matrix(sort=True)
+    genre_matrix.save('person_genre_matrix.npy')
+    print("  ✓ 已保存到 person_genre_matrix.npy（坐标轴: person_genre_matrix.axes.json）")
+    if export_csv:
+        matrix_csv = task1.export_person_genre_matrix(genre_matrix, 'person_genre_matrix.csv')
+        print(f"  ✓ 已导出 {matrix_csv}")
     
     # 任务2：分析流派发展
     print("\n任务2：分析音乐流派发展...")
@@ -127,10 +126,21 @@ def save_results():
     print("="*80)
     print("\n生成的文件：")
     print("  - person_evaluations.json: 音乐人评估结果")
+    print("  - person_genre_matrix.npy / .axes.json: 音乐人×流派占比矩阵")
     print("  - genre_analysis.json: 流派分析结果")
     print("  - oceanus_folk_candidates.json: Oceanus Folk候选人")
     print("  - analysis_summary.json: 分析摘要")
 
+def patch_results(processor, changed):
+    """图增量更新后只重算受影响的音乐人，并写回 person_evaluations_labeled.json 与占比矩阵
+    changed: processor.apply_delta(...) 的返回值
+    """
+    task1 = Task1_PersonEvaluation(processor)
+    affected = task1.patch_saved_results(changed, 'person_evaluations_labeled.json',
+                                         'person_genre_matrix.npy', threshold=0.4)
+    print(f"  ✓ 重算 {len(affected)} 个音乐人，已更新 person_evaluations_labeled.json 与 person_genre_matrix.npy")
+    return affected
+
 if __name__ == '__main__':
-    save_results()
+    save_results(export_csv='--csv' in sys.argv)
 
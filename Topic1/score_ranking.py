@@ -0,0 +1,130 @@
+"""
+评分排名服务
+ScoreRanking 把 (person_id, 评分) 维护成按 (评分降序, 加入顺序) 排好的数组，
+top_k 为切片、rank_of 为二分查找、page 按评分游标翻页；评分变化时只删除/插入改动的行，
+不再整体重排。top_k_records 在结果字典列表上做部分选择（堆），代替 sort 后取前 N 个。
+同分时按加入顺序（即输入顺序）排列，与 list.sort(key=score, reverse=True) 的稳定排序一致。
+"""
+import heapq
+
+import numpy as np
+
+
+def top_k_records(records, k, key='score'):
+    """records 中评分最高的 k 个（堆选择），与 sorted(records, key=score, reverse=True)[:k] 相同"""
+    if k is None or k >= len(records):
+        return sorted(records, key=lambda x: x[key], reverse=True)
+    rows = heapq.nsmallest(k, range(len(records)), key=lambda i: (-records[i][key], i))
+    return [records[i] for i in rows]
+
+
+class ScoreRanking:
+    """按评分降序的排名索引；_neg / _seq / _ids 三个数组按 (-评分, 加入顺序) 升序排列"""
+
+    def __init__(self, person_ids=(), scores=()):
+        person_ids = np.asarray(person_ids, dtype=np.int64)
+        neg = -np.asarray(scores, dtype=np.float64)
+        seq = np.arange(len(person_ids), dtype=np.int64)
+        order = np.lexsort((seq, neg))
+        self._neg = neg[order]
+        self._seq = seq[order]
+        self._ids = person_ids[order]
+        # person_id -> (-评分, 加入顺序)，用于定位已有行
+        self._key_of = dict(zip(person_ids.tolist(), zip(neg.tolist(), seq.tolist())))
+        self._next_seq = len(person_ids)
+
+    @classmethod
+    def from_records(cls, records, key='score'):
+        """由结果字典列表构造（同分按列表顺序）"""
+        return cls([r['person_id'] for r in records], [r[key] for r in records])
+
+    @classmethod
+    def from_table(cls, table):
+        """由 PersonEvaluationTable 构造（同分按表的行顺序，与 table.ranking() 一致）"""
+        return cls(table.person_ids, table.score)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, person_id):
+        return person_id in self._key_of
+
+    def _position(self, neg, seq):
+        """(−评分, 加入顺序) 在排序数组中的位置（首个不小于该键的位置）"""
+        lo = np.searchsorted(self._neg, neg, side='left')
+        hi = np.searchsorted(self._neg, neg, side='right')
+        return int(lo + np.searchsorted(self._seq[lo:hi], seq, side='left'))
+
+    def _items(self, lo, hi):
+        return list(zip(self._ids[lo:hi].tolist(), (-self._neg[lo:hi]).tolist()))
+
+    def top_k(self, k):
+        """前 k 名：[(person_id, score), ...]"""
+        return self._items(0, k)
+
+    def score_of(self, person_id):
+        key = self._key_of.get(person_id)
+        return None if key is None else -key[0]
+
+    def rank_of(self, person_id):
+        """名次（从 1 开始）；不在索引中返回 None"""
+        key = self._key_of.get(person_id)
+        if key is None:
+            return None
+        return self._position(*key) + 1
+
+    def page(self, cursor=None, limit=20):
+        """按评分游标翻页，返回 (本页 [(person_id, score), ...], 下一页游标或 None)
+        游标记录上一页最后一行的 (评分, 加入顺序)，翻页期间有评分更新也不会重复或跳过未改动的行
+        """
+        start = 0
+        if cursor is not None:
+            score, seq = cursor.split('|')
+            start = self._position(-float(score), int(seq) + 1)
+        end = min(start + limit, len(self))
+        items = self._items(start, end)
+        next_cursor = None
+        if end < len(self):
+            next_cursor = f'{-float(self._neg[end - 1])!r}|{int(self._seq[end - 1])}'
+        return items, next_cursor
+
+    def update(self, scores):
+        """增量更新 {person_id: 新评分}：已有的行保持加入顺序，新的行追加在后；
+        只删除、插入改动的行，其余行不动
+        """
+        changed = [(pid, float(score)) for pid, score in scores.items()
+                   if self.score_of(pid) != float(score)]
+        if not changed:
+            return
+        old_seq = {pid: self._key_of[pid][1] for pid, _ in changed if pid in self._key_of}
+        self.remove(list(old_seq))
+        new_neg, new_seq = [], []
+        for pid, score in changed:
+            seq = old_seq.get(pid)
+            if seq is None:
+                seq = self._next_seq
+                self._next_seq += 1
+            self._key_of[pid] = (-score, seq)
+            new_neg.append(-score)
+            new_seq.append(seq)
+        new_neg = np.asarray(new_neg, dtype=np.float64)
+        new_seq = np.asarray(new_seq, dtype=np.int64)
+        new_ids = np.asarray([pid for pid, _ in changed], dtype=np.int64)
+        order = np.lexsort((new_seq, new_neg))
+        new_neg, new_seq, new_ids = new_neg[order], new_seq[order], new_ids[order]
+        at = np.array([self._position(n, s) for n, s in zip(new_neg.tolist(), new_seq.tolist())],
+                      dtype=np.int64)
+        self._neg = np.insert(self._neg, at, new_neg)
+        self._seq = np.insert(self._seq, at, new_seq)
+        self._ids = np.insert(self._ids, at, new_ids)
+
+    def remove(self, person_ids):
+        """从排名中移除（行位置由二分查找定位）"""
+        at = [self._position(*self._key_of[pid]) for pid in person_ids if pid in self._key_of]
+        if not at:
+            return
+        self._neg = np.delete(self._neg, at)
+        self._seq = np.delete(self._seq, at)
+        self._ids = np.delete(self._ids, at)
+        for pid in person_ids:
+            self._key_of.pop(pid, None)
@@ -110,7 +110,7 @@ def print_song_report(song: dict, stats: Dict[str, List[dict]]) -> None:
 def main() -> None:
     args = parse_args()
 
-    processor = MusicGraphProcessor(str(args.graph))
+    processor = MusicGraphProcessor(str(args.graph), snapshot=True)
     matches = find_matching_persons(processor, args.artist)
     if not matches:
         raise SystemExit(f"No artist found matching '{args.artist}'")
@@ -3,12 +3,20 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List
 
+import numpy as np
+
 ROOT = Path(__file__).resolve().parent.parent
 PERSON_FILE = ROOT / "data" / "person_evaluations_labeled.json"
+MATRIX_FILE = ROOT / "data" / "person_genre_matrix.npy"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from person_genre_matrix import PersonGenreMatrix
 
 
 @dataclass
@@ -81,6 +89,49 @@ def find_uniform_persons(
     return results
 
 
+def find_uniform_persons_matrix(
+    matrix: PersonGenreMatrix,
+    min_genres: int,
+    max_spread: float,
+    max_dominant: float,
+) -> List[PersonShareStats]:
+    """Same filter as find_uniform_persons, evaluated on the whole share matrix at once.
+
+    Spread and limits are compared at the matrix precision; the float64 matrix written by
+    save_results.py selects exactly the persons the JSON path selects.
+    """
+    shares = np.asarray(matrix.shares)
+    limit = shares.dtype.type
+    active = shares > 0
+    num_genres = active.sum(axis=1)
+    max_share = shares.max(axis=1, initial=0.0)
+    min_share = np.where(active, shares, np.inf).min(axis=1, initial=np.inf)
+    spread = max_share - min_share
+    candidates = np.flatnonzero(
+        (num_genres >= min_genres)
+        & (spread <= limit(max_spread))
+        & (max_share <= limit(max_dominant))
+    )
+    results: List[PersonShareStats] = []
+    for row in candidates.tolist():
+        cols = np.flatnonzero(active[row])
+        row_shares = shares[row, cols].tolist()
+        results.append(PersonShareStats(
+            person_id=int(matrix.person_ids[row]),
+            name=matrix.names[row] or "",
+            stage_name=matrix.stage_names[row],
+            num_genres=len(row_shares),
+            max_share=max(row_shares),
+            min_share=min(row_shares),
+            spread=max(row_shares) - min(row_shares),
+            std_dev=std_dev(row_shares),
+            entropy=entropy(row_shares),
+            shares=row_shares,
+            genres=[matrix.genres[c] for c in cols.tolist()],
+        ))
+    return results
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Detect persons whose genre_share distribution is close to uniform"
@@ -110,23 +161,45 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional path to export full result list as JSON",
     )
+    parser.add_argument(
+        "--matrix",
+        type=Path,
+        default=MATRIX_FILE,
+        help="Person x genre share matrix (.npy or .parquet); falls back to the JSON file when missing",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    persons = load_persons()
-    uniform_persons = find_uniform_persons(
-        persons,
-        min_genres=args.min_genres,
-        max_spread=args.max_spread,
-        max_dominant=args.max_dominant,
-    )
+    if args.matrix.exists():
+        matrix = PersonGenreMatrix.load(args.matrix)
+        total_persons = len(matrix)
+        multi_genre = int(((np.asarray(matrix.shares) > 0).sum(axis=1) >= args.min_genres).sum())
+        uniform_persons = find_uniform_persons_matrix(
+            matrix,
+            min_genres=args.min_genres,
+            max_spread=args.max_spread,
+            max_dominant=args.max_dominant,
+        )
+    else:
+        persons = load_persons()
+        total_persons = len(persons)
+        multi_genre = sum(
+            1 for p in persons
+            if sum(1 for s in (p.get('genre_share') or {}).values() if s and s > 0) >= args.min_genres
+        )
+        uniform_persons = find_uniform_persons(
+            persons,
+            min_genres=args.min_genres,
+            max_spread=args.max_spread,
+            max_dominant=args.max_dominant,
+        )
 
     uniform_persons.sort(key=lambda x: (x.spread, x.std_dev, -x.entropy))
 
-    print(f"[INFO] total persons: {len(persons)}")
-    print(f"[INFO] persons with >= {args.min_genres} genres: {sum(1 for p in persons if sum(1 for s in (p.get('genre_share') or {}).values() if s and s > 0) >= args.min_genres)}")
+    print(f"[INFO] total persons: {total_persons}")
+    print(f"[INFO] persons with >= {args.min_genres} genres: {multi_genre}")
     print(f"[INFO] matching uniform persons: {len(uniform_persons)}")
 
     limit = min(args.top, len(uniform_persons))
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import argparse
 import sys
-from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -22,7 +21,6 @@ INFLUENCE_WEIGHTS: Dict[str, int] = {
     "InStyleOf": 2,
 }
 ROLE_TYPES = {"PerformerOf", "ComposerOf", "LyricistOf", "ProducerOf"}
-WORK_TYPES = {"Song", "Album"}
 
 
 def parse_args() -> argparse.Namespace:
@@ -64,14 +62,7 @@ def parse_args() -> argparse.Namespace:
 
 
 def compute_work_influence(processor: MusicGraphProcessor) -> Dict[int, float]:
-    influence = defaultdict(float)
-    for edge_type, weight in INFLUENCE_WEIGHTS.items():
-        for source_id, target_id in processor.get_edges_by_type(edge_type):
-            target_node = processor.get_node(target_id)
-            if not target_node or target_node.get("Node Type") not in WORK_TYPES:
-                continue
-            influence[target_id] += weight
-    return influence
+    return processor.influence_table.score_map(INFLUENCE_WEIGHTS)
 
 
 def collect_artist_stats(
@@ -79,13 +70,9 @@ def collect_artist_stats(
     work_influence: Dict[int, float],
 ) -> List[Dict[str, object]]:
     stats: List[Dict[str, object]] = []
+    index = processor.person_work_index
     for person in processor.get_nodes_by_type("Person"):
-        works = processor.get_person_works(person["id"])
-        unique_work_ids = set()
-        for nodes in works.values():
-            for node in nodes:
-                if node.get("Node Type") in WORK_TYPES:
-                    unique_work_ids.add(node["id"])
+        unique_work_ids = index.work_ids_of(person["id"])
         if not unique_work_ids:
             continue
         total_influence = sum(work_influence.get(work_id, 0.0) for work_id in unique_work_ids)
@@ -114,7 +101,7 @@ def main() -> None:
     if not args.graph.exists():
         raise FileNotFoundError(f"Graph file not found: {args.graph}")
 
-    processor = MusicGraphProcessor(str(args.graph))
+    processor = MusicGraphProcessor(str(args.graph), snapshot=True)
     work_influence = compute_work_influence(processor)
     stats = collect_artist_stats(processor, work_influence)
 
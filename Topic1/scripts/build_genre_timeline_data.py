@@ -81,7 +81,7 @@ def write_payload(payload: Dict[str, Any], path: Path) -> None:
 
 
 def main() -> None:
-    processor = MusicGraphProcessor(str(GRAPH_PATH))
+    processor = MusicGraphProcessor(str(GRAPH_PATH), snapshot=True)
     task = Task2_GenreAnalysis(processor)
 
     genres = task.get_all_genres()
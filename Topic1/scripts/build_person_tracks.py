@@ -163,13 +163,12 @@ def build_person_tracks(
 ) -> Dict[str, Any] | None:
     """为单个音乐人生成包含歌曲/专辑及其引用关系的网络结构."""
     person_id = person["person_id"]
-    works = processor.get_person_works(person_id)
+    works = processor.person_work_index.role_work_ids(person_id)
     work_nodes: Dict[Tuple[str, int], Dict[str, Any]] = {}
     for role in ROLES:
-        for node in works.get(role, []):
-            node_type = node.get("Node Type")
-            if node_type in {"Song", "Album"}:
-                work_nodes[(node_type, node["id"])] = node
+        for work_id in works.get(role, []):
+            node = processor.get_node(work_id)
+            work_nodes[(node.get("Node Type"), work_id)] = node
 
     if not work_nodes:
         return {
@@ -183,12 +182,16 @@ def build_person_tracks(
     nodes: Dict[str, Dict[str, Any]] = {}
     external_nodes: Dict[str, Dict[str, Any]] = {}
     links_set: Set[Tuple[str, str, str]] = set()
+    influence = processor.influence_table
 
     for (node_type, work_id), node in work_nodes.items():
         node_prefix = node_type.lower()
         node_key = f"{node_prefix}:{work_id}"
+        # 只计来源为歌曲/专辑的影响边
         influence_counts = {"cover": 0, "sample": 0, "reference": 0, "style": 0}
-        release_year = processor.extract_date(node)
+        for edge_type, count in influence.counts_of(work_id, work_sources_only=True).items():
+            influence_counts[TYPE_TO_KEY[edge_type]] += count
+        release_year = processor.get_year(work_id)
         artist_entry = {
             "id": node_key,
             "work_type": node_type,
@@ -220,7 +223,6 @@ def build_person_tracks(
             source_node = processor.get_node(source_id)
             if not source_node or source_node.get("Node Type") not in {"Song", "Album"}:
                 continue
-            influence_counts[key] += 1
 
             source_prefix = source_node.get("Node Type").lower()
             source_key = f"{source_prefix}:{source_id}"
@@ -237,7 +239,7 @@ def build_person_tracks(
                     "title": source_node.get("name"),
                     "genre": source_node.get("genre"),
                     "notable": bool(source_node.get("notable")),
-                    "release_year": processor.extract_date(source_node),
+                    "release_year": processor.get_year(source_id),
                     "single": bool(source_node.get("single")) if source_node.get("Node Type") == "Song" else False,
                     "own": owner_id == person_id,
                     "artist_id": owner_id,
@@ -296,7 +298,7 @@ def format_display_name(name: str | None, stage: str | None) -> str:
 def main() -> None:
     """批量生成每位音乐人的单曲网络文件并输出到前端可读取的位置."""
     persons = load_persons()
-    processor = MusicGraphProcessor(str(GRAPH_PATH))
+    processor = MusicGraphProcessor(str(GRAPH_PATH), snapshot=True)
 
     PUBLIC_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Any
 
+import numpy as np
+
 THRESHOLD = 0.00001
 TOP_PREVIEW_COUNT = 100
 
@@ -11,9 +14,21 @@ ROOT = Path(__file__).resolve().parent.parent
 PERSON_SOURCE = ROOT / "data" / "person_evaluations_labeled.json"
 DEFAULT_VIS_PATH = ROOT / "data" / "visualization_data.json"
 PUBLIC_VIS_PATH = ROOT / "genre-visualization" / "public" / "data" / "visualization_data.json"
+MATRIX_SOURCE = ROOT / "data" / "person_genre_matrix.npy"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from person_genre_matrix import PersonGenreMatrix
+
 
+def load_share_matrix() -> PersonGenreMatrix | None:
+    """Load the person x genre share matrix written by save_results.py, if present."""
+    if not MATRIX_SOURCE.exists():
+        return None
+    return PersonGenreMatrix.load(MATRIX_SOURCE)
 
-def load_target_genres() -> List[str]:
+
+def load_target_genres(matrix: PersonGenreMatrix | None = None) -> List[str]:
     """Get the ordered genre list, ensuring every genre in the source data is kept."""
     existing_order: List[str] | None = None
     for candidate in (DEFAULT_VIS_PATH, PUBLIC_VIS_PATH):
@@ -25,19 +40,22 @@ def load_target_genres() -> List[str]:
                     existing_order = genres
                     break
 
-    with PERSON_SOURCE.open("r", encoding="utf-8") as f:
-        persons = json.load(f)
-
-    genre_set = []
-    seen = set()
-    for person in persons:
-        share_map = person.get("genre_share")
-        if not isinstance(share_map, dict):
-            continue
-        for genre in share_map.keys():
-            if genre and genre not in seen:
-                seen.add(genre)
-                genre_set.append(genre)
+    if matrix is not None:
+        genre_set = [genre for genre in matrix.genres if genre]
+    else:
+        with PERSON_SOURCE.open("r", encoding="utf-8") as f:
+            persons = json.load(f)
+
+        genre_set = []
+        seen = set()
+        for person in persons:
+            share_map = person.get("genre_share")
+            if not isinstance(share_map, dict):
+                continue
+            for genre in share_map.keys():
+                if genre and genre not in seen:
+                    seen.add(genre)
+                    genre_set.append(genre)
 
     if not genre_set:
         raise RuntimeError("Unable to determine target genres list")
@@ -99,6 +117,34 @@ def collect_artists_by_genre(genres: List[str]) -> Dict[str, List[Dict[str, Any]
                     "genre_share": share
                 })
 
+    _sort_buckets(buckets)
+    return buckets
+
+
+def collect_artists_from_matrix(
+    matrix: PersonGenreMatrix, genres: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Same buckets as collect_artists_by_genre, read column by column from the share matrix."""
+    buckets: Dict[str, List[Dict[str, Any]]] = {genre: [] for genre in genres}
+    person_ids = matrix.person_ids.tolist()
+    scores = matrix.scores.tolist()
+    for genre in genres:
+        if genre not in matrix.genre_index:
+            continue
+        column = np.asarray(matrix.column(genre))
+        rows = np.flatnonzero(column >= THRESHOLD)
+        buckets[genre] = [{
+            "person_id": person_ids[i],
+            "name": matrix.names[i],
+            "stage_name": matrix.stage_names[i],
+            "score": scores[i],
+            "genre_share": share,
+        } for i, share in zip(rows.tolist(), column[rows].tolist())]
+    _sort_buckets(buckets)
+    return buckets
+
+
+def _sort_buckets(buckets: Dict[str, List[Dict[str, Any]]]) -> None:
     # Sort each bucket by score desc, then genre_share desc, then name
     for artists in buckets.values():
         artists.sort(key=lambda a: (
@@ -106,7 +152,6 @@ def collect_artists_by_genre(genres: List[str]) -> Dict[str, List[Dict[str, Any]
             -(a.get("genre_share") or 0),
             (a.get("name") or "")
         ))
-    return buckets
 
 
 def build_visualization_payload(genres: List[str], buckets: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
@@ -125,11 +170,15 @@ def build_visualization_payload(genres: List[str], buckets: Dict[str, List[Dict[
 
 
 def main() -> None:
-    if not PERSON_SOURCE.exists():
+    matrix = load_share_matrix()
+    if matrix is None and not PERSON_SOURCE.exists():
         raise FileNotFoundError(f"Source file not found: {PERSON_SOURCE}")
 
-    genres = load_target_genres()
-    buckets = collect_artists_by_genre(genres)
+    genres = load_target_genres(matrix)
+    if matrix is not None:
+        buckets = collect_artists_from_matrix(matrix, genres)
+    else:
+        buckets = collect_artists_by_genre(genres)
     payload = build_visualization_payload(genres, buckets)
 
     DEFAULT_VIS_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+"""Write a smaller working graph (one genre / year window plus neighbors) for fast iteration.
+
+Usage example:
+    python scripts/slice_graph.py --genre "Oceanus Folk" --neighbors 2 --output Topic1_graph.oceanus_folk.json
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from data_preprocessing import MusicGraphProcessor
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Slice Topic1_graph.json by genre / year / node type and export the induced subgraph"
+    )
+    parser.add_argument(
+        "--graph",
+        type=Path,
+        default=PROJECT_ROOT / "Topic1_graph.json",
+        help="Path to Topic1_graph.json",
+    )
+    parser.add_argument(
+        "--genre",
+        action="append",
+        default=None,
+        help="Genre to keep (repeatable)",
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        nargs=2,
+        metavar=("START", "END"),
+        default=None,
+        help="Inclusive release year window",
+    )
+    parser.add_argument(
+        "--node-type",
+        action="append",
+        default=None,
+        help="Node type of the seed nodes (repeatable)",
+    )
+    parser.add_argument(
+        "--neighbors",
+        type=int,
+        default=1,
+        help="Also include nodes within this many hops of the seeds",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Where to write the sliced graph JSON",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.graph.exists():
+        raise FileNotFoundError(f"Graph file not found: {args.graph}")
+
+    processor = MusicGraphProcessor(str(args.graph), snapshot=True)
+    sliced = processor.slice(
+        genres=args.genre,
+        years=tuple(args.years) if args.years else None,
+        node_types=args.node_type,
+        include_neighbors=args.neighbors,
+    )
+    sliced.export_graph(args.output)
+    print(
+        f"Wrote {args.output}: {len(sliced.nodes_by_id)} nodes, {sliced.edge_count} edges "
+        f"(full graph: {len(processor.nodes_by_id)} nodes, {processor.edge_count} edges)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare genre-label thresholds on the person x genre share matrix.
+
+Labels for every threshold are computed in one vectorized pass
+(PersonGenreMatrix.label_sweep) with the same rule as
+Task1_PersonEvaluation.assign_genre_labels.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from person_genre_matrix import PersonGenreMatrix
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep genre-label thresholds over the share matrix")
+    parser.add_argument(
+        "--matrix",
+        type=Path,
+        default=PROJECT_ROOT / "data" / "person_genre_matrix.npy",
+        help="Person x genre share matrix written by save_results.py (.npy or .parquet)",
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        default=[0.2, 0.3, 0.4, 0.5, 0.6],
+        help="Thresholds to compare",
+    )
+    parser.add_argument(
+        "--no-fallback",
+        action="store_true",
+        help="Do not assign the top genre to persons below every threshold",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON file for the counts")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.matrix.exists():
+        raise FileNotFoundError(f"Matrix not found: {args.matrix}")
+    matrix = PersonGenreMatrix.load(args.matrix)
+    sweep = matrix.label_sweep(args.thresholds, fallback_top=not args.no_fallback)
+
+    print(f"[INFO] persons: {len(matrix)}, genres: {len(matrix.genres)}")
+    labeled = sweep.labeled_counts()
+    header = "genre".ljust(24) + "".join(f"{t:>8g}" for t in sweep.thresholds)
+    print(header)
+    for j, genre in enumerate(sweep.genres):
+        print(genre.ljust(24) + "".join(f"{int(n):>8d}" for n in sweep.counts[:, j].tolist()))
+    print("labeled".ljust(24) + "".join(f"{labeled[t]:>8d}" for t in sweep.thresholds))
+
+    if args.output:
+        payload = {
+            "thresholds": sweep.thresholds,
+            "labeled_persons": [labeled[t] for t in sweep.thresholds],
+            "genre_counts": {str(t): sweep.genre_counts(t) for t in sweep.thresholds},
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with args.output.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
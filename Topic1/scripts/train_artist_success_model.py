@@ -146,13 +146,10 @@ def build_person_work_maps(processor: MusicGraphProcessor) -> Tuple[
     persons = {node["id"]: node for node in processor.get_nodes_by_type("Person")}
     person_to_works: Dict[int, List[dict]] = {}
     work_to_persons: Dict[int, List[int]] = defaultdict(list)
+    index = processor.person_work_index
 
     for pid in persons.keys():
-        works_by_role = processor.get_person_works(pid)
-        flattened = []
-        for role_works in works_by_role.values():
-            flattened.extend(role_works)
-        unique_works = list({w["id"]: w for w in flattened}.values())
+        unique_works = [processor.get_node(wid) for wid in index.work_ids_of(pid)]
         person_to_works[pid] = unique_works
         for work in unique_works:
             work_to_persons[work["id"]].append(pid)
@@ -161,19 +158,17 @@ def build_person_work_maps(processor: MusicGraphProcessor) -> Tuple[
 
 
 def compute_artist_influence(
-    links: List[dict],
+    processor: MusicGraphProcessor,
     work_to_persons: Dict[int, List[int]],
 ) -> Dict[int, float]:
     """Aggregate influence weights for each artist based on their works."""
+    work_influence = processor.influence_table.score_map(INFLUENCE_WEIGHTS)
     totals: Dict[int, float] = defaultdict(float)
-    for edge in links:
-        weight = INFLUENCE_WEIGHTS.get(edge.get("Edge Type"))
-        if weight is None:
-            continue
-        target_work = edge.get("target")
-        if target_work is None:
+    for work_id, pids in work_to_persons.items():
+        weight = work_influence.get(work_id, 0.0)
+        if not weight:
             continue
-        for pid in work_to_persons.get(target_work, []):
+        for pid in pids:
             totals[pid] += weight
     return totals
 
@@ -214,18 +209,15 @@ def compute_target_scores(
 
 
 def build_collaboration_graph(
+    processor: MusicGraphProcessor,
     person_ids: Iterable[int],
-    work_to_persons: Dict[int, List[int]],
 ) -> nx.Graph:
+    """Persons sharing at least one work, read from the processor's co-credit matrix."""
     graph = nx.Graph()
     graph.add_nodes_from(person_ids)
 
-    for person_list in work_to_persons.values():
-        if len(person_list) < 2:
-            continue
-        for i, pid in enumerate(person_list):
-            for other_pid in person_list[i + 1 :]:
-                graph.add_edge(pid, other_pid)
+    sources, targets, _ = processor.co_credit.pairs()
+    graph.add_edges_from(zip(sources.tolist(), targets.tolist()))
 
     return graph
 
@@ -451,12 +443,12 @@ def main() -> None:
     args = parse_args()
 
     graph, raw_data = load_graph(args.graph)
-    processor = MusicGraphProcessor(str(args.graph))
+    processor = MusicGraphProcessor(str(args.graph), snapshot=True)
     persons, p2w, w2p = build_person_work_maps(processor)
     targets = compute_target_scores(processor, p2w)
-    artist_influence = compute_artist_influence(raw_data["links"], w2p)
+    artist_influence = compute_artist_influence(processor, w2p)
     
-    collab_g = build_collaboration_graph(persons.keys(), w2p)
+    collab_g = build_collaboration_graph(processor, persons.keys())
     # 这里注意：确保你原来的 build_influence_graph 逻辑是正确的
     infl_g = nx.DiGraph() # Placeholder, use your original function
     infl_g.add_nodes_from(persons.keys())
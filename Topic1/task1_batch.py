@@ -0,0 +1,373 @@
+"""
+任务1的批量评估
+对全部音乐人一次性计算 evaluate_person 的各项指标：以关联索引中的 (音乐人, 作品) 对为行，
+作品属性取自列式存储、影响力取自作品影响力计数表（processor.influence_table），
+每项指标都是对这些行按音乐人分组的 bincount / 去重计数，不再逐人遍历作品和入边。
+结果为列式的 PersonEvaluationTable，to_records() 还原为与 evaluate_person 完全相同的字典。
+综合评分拆为 原始特征 × 权重：PersonFeatureTable 按图文件指纹缓存特征矩阵（*.features/），
+调整权重时只需在特征矩阵上重新计分，不再遍历图。
+"""
+from pathlib import Path
+
+import numpy as np
+
+from data_preprocessing import DATE_PRIORITY
+from graph_csr import gather_spans
+from person_genre_matrix import PersonGenreMatrix
+
+LABEL_EDGE_TYPES = ('RecordedBy', 'DistributedBy')
+
+# 综合评分的特征（已乘上 evaluate_person 中的缩放：成名率 ×100、角色数 ×5）与默认权重
+SCORE_FEATURES = (
+    'total_works', 'notable_rate_pct', 'time_span', 'role_points',
+    'influence_score', 'collaborators_count', 'record_labels_count',
+)
+SCORE_WEIGHTS = {
+    'total_works': 0.15,
+    'notable_rate_pct': 0.25,
+    'time_span': 0.1,
+    'role_points': 0.1,
+    'influence_score': 0.2,
+    'collaborators_count': 0.1,
+    'record_labels_count': 0.1,
+}
+
+
+def default_cache_dir(json_file):
+    """默认特征缓存目录：Topic1_graph.json -> Topic1_graph.features/"""
+    path = Path(json_file)
+    return path.with_name(path.stem + '.features')
+
+
+def weight_matrix(weights):
+    """权重 -> (K, 特征数) 的矩阵与是否为单组权重
+    weights 可以是 {特征: 权重}（未给出的特征权重为 0）、长度为特征数的向量，或每行一组权重的矩阵
+    """
+    if isinstance(weights, dict):
+        unknown = set(weights) - set(SCORE_FEATURES)
+        if unknown:
+            raise ValueError(f"未知的评分特征: {sorted(unknown)}")
+        weights = [weights.get(name, 0) for name in SCORE_FEATURES]
+    weights = np.asarray(weights, dtype=np.float64)
+    single = weights.ndim == 1
+    weights = np.atleast_2d(weights)
+    if weights.ndim != 2 or weights.shape[1] != len(SCORE_FEATURES):
+        raise ValueError(f"权重形状应为 ({len(SCORE_FEATURES)},) 或 (K, {len(SCORE_FEATURES)})，"
+                         f"实际为 {weights.shape}")
+    return weights, single
+
+
+def score_features(features, weights):
+    """features: (R, 特征数)；单组权重返回 (R,)，权重矩阵 (K, 特征数) 返回 (R, K)
+    按特征顺序逐项累加（与 evaluate_person 的求值顺序相同），默认权重下与 score 逐位一致
+    """
+    weights, single = weight_matrix(weights)
+    scores = np.zeros((features.shape[0], weights.shape[0]), dtype=np.float64)
+    for k in range(len(SCORE_FEATURES)):
+        scores += features[:, k, None] * weights[None, :, k]
+    return scores[:, 0] if single else scores
+
+
+def _group_count(rows, num_rows):
+    return np.bincount(rows, minlength=num_rows).astype(np.int64)
+
+
+def _distinct_count(rows, values, num_values, num_rows):
+    """每行中不同 values 的个数"""
+    keys = np.unique(rows.astype(np.int64) * num_values + values)
+    return _group_count(keys // num_values, num_rows)
+
+
+class PersonEvaluationTable:
+    """批量评估结果，第 i 行对应 person_ids[i]（顺序与输入一致）
+    min_date / max_date 缺失为 -1；genre_counts 的列为 genre_names，genre_share 的列为 all_genres；
+    genre_order_offsets / genre_order 给出每行流派按首次出现顺序的编码（genre_distribution 的键顺序）
+    """
+
+    COLUMNS = (
+        'person_ids', 'total_works', 'songs', 'albums', 'notable_works', 'notable_rate',
+        'time_span', 'min_date', 'max_date', 'role_counts', 'role_count',
+        'influence_score', 'collaborators_count', 'record_labels_count', 'score',
+        'genre_counts', 'genre_share', 'genre_order_offsets', 'genre_order',
+    )
+
+    def __init__(self, names, stage_names, role_names, genre_names, all_genres, arrays):
+        self.names = names
+        self.stage_names = stage_names
+        self.role_names = list(role_names)
+        self.genre_names = list(genre_names)
+        self.all_genres = list(all_genres)
+        for name in self.COLUMNS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def ranking(self):
+        """按评分降序的行号（同分保持原顺序，与 evaluate_all_persons 的排序一致）"""
+        return np.argsort(-self.score, kind='stable')
+
+    def _roles(self, counts, cache):
+        # 与 evaluate_person 相同：由 role_count_map 形式的字典构造集合，保证集合的迭代顺序一致
+        key = tuple(n > 0 for n in counts)
+        roles = cache.get(key)
+        if roles is None:
+            roles = cache[key] = list(set({r: 1 for r, hit in zip(self.role_names, key) if hit}))
+        return roles
+
+    def to_records(self, sort=False):
+        """逐行还原为 evaluate_person 的结果字典；sort=True 时按评分降序"""
+        rows = self.ranking() if sort else np.arange(len(self))
+        columns = {name: getattr(self, name).tolist() for name in (
+            'person_ids', 'total_works', 'songs', 'albums', 'notable_works', 'notable_rate',
+            'time_span', 'min_date', 'max_date', 'role_counts', 'influence_score',
+            'collaborators_count', 'record_labels_count', 'score', 'genre_counts',
+            'genre_share', 'genre_order_offsets', 'genre_order')}
+        genre_names = self.genre_names
+        role_cache = {}
+        records = []
+        for i in rows.tolist():
+            total = columns['total_works'][i]
+            role_counts = columns['role_counts'][i]
+            roles = self._roles(role_counts, role_cache)
+            by_role = dict(zip(self.role_names, role_counts))
+            counts = columns['genre_counts'][i]
+            lo, hi = columns['genre_order_offsets'][i], columns['genre_order_offsets'][i + 1]
+            has_dates = columns['min_date'][i] >= 0
+            records.append({
+                'person_id': columns['person_ids'][i],
+                'name': self.names[i],
+                'stage_name': self.stage_names[i],
+                'total_works': total,
+                'songs': columns['songs'][i],
+                'albums': columns['albums'][i],
+                'notable_works': columns['notable_works'][i],
+                'notable_rate': columns['notable_rate'][i] if total > 0 else 0,
+                'time_span': columns['time_span'][i],
+                'min_date': columns['min_date'][i] if has_dates else None,
+                'max_date': columns['max_date'][i] if has_dates else None,
+                'roles': list(roles),
+                'role_count': len(roles),
+                'genre_distribution': {genre_names[g]: counts[g]
+                                       for g in columns['genre_order'][lo:hi]},
+                'genre_share': dict(zip(self.all_genres, columns['genre_share'][i])),
+                'influence_score': columns['influence_score'][i],
+                'collaborators_count': columns['collaborators_count'][i],
+                'record_labels_count': columns['record_labels_count'][i],
+                'score': columns['score'][i],
+                'works_by_role': {role: by_role[role] for role in roles},
+            })
+        return records
+
+    def genre_share_matrix(self, sort=False, dtype=np.float64):
+        """genre_share 列直接转为 PersonGenreMatrix；sort=True 时行按评分降序"""
+        rows = self.ranking() if sort else np.arange(len(self))
+        row_list = rows.tolist()
+        return PersonGenreMatrix(
+            self.person_ids[rows], self.all_genres, self.genre_share[rows],
+            names=[self.names[i] for i in row_list],
+            stage_names=[self.stage_names[i] for i in row_list],
+            scores=self.score[rows], dtype=dtype)
+
+
+def evaluate_persons(processor, all_genres, person_ids, influence_weights):
+    """批量计算 evaluate_person 的全部指标，返回 PersonEvaluationTable
+    person_ids 为 None 时取全部 Person 节点（get_nodes_by_type 的顺序）；不存在或不是 Person 的ID被跳过
+    influence_weights: {影响边类型: 权重}
+    """
+    if person_ids is None:
+        person_ids = [person['id'] for person in processor.get_nodes_by_type('Person')]
+    persons = [(pid, processor.get_node(pid)) for pid in person_ids]
+    persons = [(pid, node) for pid, node in persons
+               if node is not None and node.get('Node Type') == 'Person']
+    num_rows = len(persons)
+
+    index = processor.person_work_index
+    columns = processor.columns
+    graph = processor._query_graph()
+
+    # 行 -> 关联索引中的来源序号（没有作品的音乐人区间为空）
+    person_ordinals = np.array([index.person_ordinal_of.get(pid, -1) for pid, _ in persons],
+                               dtype=np.int64)
+    has_works = person_ordinals >= 0
+    lo = np.where(has_works, index.offsets[person_ordinals], 0)
+    hi = np.where(has_works, index.offsets[person_ordinals + 1], 0)
+    rows, pos = gather_spans(lo, hi)
+    # (音乐人, 去重作品) 对，作品顺序与 work_ids_of 一致
+    work_ids = index.works[pos]
+    work_ordinals = columns.ordinals(work_ids.tolist())
+    node_type = columns.node_type[work_ordinals]
+    genre = columns.genre[work_ordinals].astype(np.int64)
+
+    total_works = _group_count(rows, num_rows)
+    songs = _group_count(rows[node_type == columns.node_type_code('Song')], num_rows)
+    albums = _group_count(rows[node_type == columns.node_type_code('Album')], num_rows)
+    # evaluate_person 以 notable == True 判断，逐个不同作品取原始值
+    distinct_works, work_inverse = np.unique(work_ids, return_inverse=True)
+    notable_of = np.array([processor.get_node(w).get('notable') == True
+                           for w in distinct_works.tolist()], dtype=bool)
+    notable_works = _group_count(rows[notable_of[work_inverse]], num_rows)
+    notable_rate = notable_works / np.maximum(total_works, 1)
+
+    # 时间跨度：默认日期优先级的年份，缺失（及 0）不计
+    years = columns.resolved_year(DATE_PRIORITY)[work_ordinals].astype(np.int64)
+    dated = years > 0
+    min_date = np.full(num_rows, np.iinfo(np.int64).max, dtype=np.int64)
+    max_date = np.full(num_rows, -1, dtype=np.int64)
+    np.minimum.at(min_date, rows[dated], years[dated])
+    np.maximum.at(max_date, rows[dated], years[dated])
+    has_dates = max_date >= 0
+    min_date[~has_dates] = -1
+    time_span = np.where(has_dates, max_date - min_date, 0)
+
+    # 角色：角色边条数（含重复边）
+    role_names = index.role_names
+    role_counts = np.zeros((num_rows, len(role_names)), dtype=np.int64)
+    role_counts[has_works] = index.role_counts[person_ordinals[has_works]]
+    role_count = (role_counts > 0).sum(axis=1)
+
+    # 流派分布：(行, 流派) 计数，及每行流派的首次出现顺序
+    genre_names = columns.genre_names
+    num_genres = max(len(genre_names), 1)
+    with_genre = genre >= 0
+    genre_keys = rows[with_genre].astype(np.int64) * num_genres + genre[with_genre]
+    keys, first, counts = np.unique(genre_keys, return_index=True, return_counts=True)
+    genre_counts = np.zeros((num_rows, len(genre_names)), dtype=np.int64)
+    genre_counts[keys // num_genres, keys % num_genres] = counts
+    order = np.lexsort((first, keys // num_genres))
+    genre_order = (keys[order] % num_genres).astype(np.int64)
+    genre_order_offsets = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // num_genres, minlength=num_rows), out=genre_order_offsets[1:])
+    # 26流派占比（Song/Album 的有流派作品）
+    share_codes = [columns.genre_code(g) for g in all_genres]
+    share_counts = np.zeros((num_rows, len(all_genres)), dtype=np.int64)
+    for j, code in enumerate(share_codes):
+        if code >= 0:
+            share_counts[:, j] = genre_counts[:, code]
+    share_total = genre_counts.sum(axis=1)
+    genre_share = np.where(share_total[:, None] > 0,
+                           share_counts / np.maximum(share_total, 1)[:, None], 0.0)
+
+    # 影响力：作品影响力计数表上的一次矩阵-向量乘法
+    influence = processor.influence_table
+    work_influence = influence.scores(influence_weights)
+    table_rows = np.array([influence.work_ordinal_of[w] for w in work_ids.tolist()], dtype=np.int64)
+    influence_score = np.zeros(num_rows, dtype=work_influence.dtype)
+    np.add.at(influence_score, rows, work_influence[table_rows])
+    graph_ordinals = np.array([graph.ordinal_of[w] for w in work_ids.tolist()], dtype=np.int64)
+
+    # 合作者：共同署名矩阵（B·Bᵀ 去对角线）的行非零数
+    collaborators_count = np.zeros(num_rows, dtype=np.int64)
+    collaborators_count[has_works] = processor.co_credit.counts()[person_ordinals[has_works]]
+    self_ids = np.array([pid for pid, _ in persons], dtype=np.int64)
+
+    # 唱片公司：作品的 RecordedBy / DistributedBy 来源（平行边在计数时按 (行, 来源) 去重）
+    label_rows, labels, _, _ = graph.expand(graph_ordinals, LABEL_EDGE_TYPES, 'in')
+    record_labels_count = _distinct_count(rows[label_rows], labels.astype(np.int64),
+                                          graph.num_nodes, num_rows)
+
+    # 与 evaluate_person 相同的求值顺序，保证浮点结果逐位一致
+    features = np.column_stack([
+        total_works, notable_rate * 100, time_span, role_count * 5,
+        influence_score, collaborators_count, record_labels_count,
+    ]).astype(np.float64)
+    score = score_features(features, SCORE_WEIGHTS)
+    return PersonEvaluationTable(
+        [node.get('name', 'Unknown') for _, node in persons],
+        [node.get('stage_name') for _, node in persons],
+        role_names, genre_names, all_genres, {
+            'person_ids': self_ids,
+            'total_works': total_works,
+            'songs': songs,
+            'albums': albums,
+            'notable_works': notable_works,
+            'notable_rate': notable_rate,
+            'time_span': time_span,
+            'min_date': min_date,
+            'max_date': max_date,
+            'role_counts': role_counts,
+            'role_count': role_count,
+            'influence_score': influence_score,
+            'collaborators_count': collaborators_count,
+            'record_labels_count': record_labels_count,
+            'score': score,
+            'genre_counts': genre_counts,
+            'genre_share': genre_share,
+            'genre_order_offsets': genre_order_offsets,
+            'genre_order': genre_order,
+        })
+
+
+class PersonFeatureTable:
+    """综合评分的原始特征：features[i] 为 person_ids[i] 的 SCORE_FEATURES 各项（行顺序同 get_nodes_by_type）"""
+
+    ARRAY_NAMES = ('person_ids', 'features')
+
+    def __init__(self, person_ids, features, influence_weights):
+        self.person_ids = person_ids
+        self.features = features
+        self.influence_weights = dict(influence_weights)
+        self.row_of = {pid: i for i, pid in enumerate(person_ids.tolist())}
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    @classmethod
+    def from_table(cls, table, influence_weights):
+        """由 PersonEvaluationTable 取出评分特征"""
+        features = np.column_stack([
+            table.total_works, table.notable_rate * 100, table.time_span, table.role_count * 5,
+            table.influence_score, table.collaborators_count, table.record_labels_count,
+        ]).astype(np.float64)
+        return cls(table.person_ids, features, influence_weights)
+
+    @classmethod
+    def build(cls, processor, all_genres, influence_weights):
+        return cls.from_table(evaluate_persons(processor, all_genres, None, influence_weights),
+                              influence_weights)
+
+    @classmethod
+    def load_or_build(cls, processor, all_genres, influence_weights, cache_dir=None):
+        """有图文件时按其指纹读写磁盘缓存（影响力权重不同则重建）；增量更新过的图只在内存中构建"""
+        from graph_snapshot import load_snapshot, save_snapshot, snapshot_is_fresh
+
+        json_file = processor.json_file
+        if json_file is None:
+            return cls.build(processor, all_genres, influence_weights)
+        cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(json_file)
+        if snapshot_is_fresh(cache_dir, json_file):
+            arrays, meta = load_snapshot(cache_dir)
+            if (meta.get('features') == list(SCORE_FEATURES)
+                    and meta.get('influence_weights') == dict(influence_weights)):
+                return cls(arrays['person_ids'], arrays['features'], influence_weights)
+        table = cls.build(processor, all_genres, influence_weights)
+        try:
+            save_snapshot(cache_dir, json_file, table.arrays(), {
+                'features': list(SCORE_FEATURES),
+                'influence_weights': table.influence_weights,
+            })
+        except OSError as exc:
+            print(f"[WARN] 写入特征缓存失败: {exc}")
+        return table
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    def scores(self, weights=None):
+        """weights 缺省为 SCORE_WEIGHTS；单组权重返回 (R,)，权重矩阵 (K, 特征数) 返回 (R, K)"""
+        return score_features(self.features, SCORE_WEIGHTS if weights is None else weights)
+
+    def ranking(self, weights=None):
+        """按评分降序的行号（同分保持原顺序）；权重矩阵时返回 (K, R)，每行对应一组权重"""
+        scores = self.scores(weights)
+        if scores.ndim == 1:
+            return np.argsort(-scores, kind='stable')
+        return np.argsort(-scores.T, axis=1, kind='stable')
+
+    def top(self, weights=None, top_n=10):
+        """单组权重下的前 top_n 名：[(person_id, score), ...]"""
+        scores = self.scores(weights)
+        if scores.ndim != 1:
+            raise ValueError("top 只接受单组权重")
+        rows = np.argsort(-scores, kind='stable')[:top_n]
+        return list(zip(self.person_ids[rows].tolist(), scores[rows].tolist()))
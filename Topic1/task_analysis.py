@@ -6,10 +6,12 @@
 """
 import json
 import sys
+import time
 from collections import defaultdict, Counter
 from datetime import datetime
 import re
-from data_preprocessing import MusicGraphProcessor
+from data_preprocessing import MusicGraphProcessor, RELEASE_DATE_ONLY, ROLE_EDGE_TYPES
+from graph_query import Edge, Node
 
 # 设置输出编码
 if sys.platform == 'win32':
@@ -24,15 +26,32 @@ if sys.platform == 'win32':
 class Task1_PersonEvaluation:
     """任务1：评估音乐人的表现"""
     
+    # 影响力权重：被翻唱 3，被采样 2，被引用（插值/歌词引用）1，被模仿 1
+    INFLUENCE_WEIGHTS = {
+        'CoverOf': 3,
+        'DirectlySamples': 2,
+        'InterpolatesFrom': 1,
+        'LyricalReferenceTo': 1,
+        'InStyleOf': 1,
+    }
+    
     def __init__(self, processor):
         self.processor = processor
+        self._influence = None
+        self._features = None
+        self._leaderboard = None
         # 统一的26个流派列表（从数据中动态抽取，稳定排序）
-        genres = set()
-        for node in self.processor.get_nodes_by_type('Song') + self.processor.get_nodes_by_type('Album'):
-            g = node.get('genre')
-            if g:
-                genres.add(g)
-        self.all_genres = sorted(list(genres))
+        self.all_genres = self._collect_genres()
+    
+    def _collect_genres(self):
+        # 读列式流派编码，不逐个解码作品节点（attach 的工作进程直接 mmap 该列）
+        return self.processor.columns.genres_of(('Song', 'Album'))
+    
+    def _work_influence(self):
+        """作品ID -> 加权影响力（整图一次矩阵-向量乘法）"""
+        if self._influence is None:
+            self._influence = self.processor.influence_table.score_map(self.INFLUENCE_WEIGHTS)
+        return self._influence
     
     def evaluate_person(self, person_id):
         """评估单个音乐人的表现"""
@@ -40,14 +59,10 @@ class Task1_PersonEvaluation:
         if not person or person.get('Node Type') != 'Person':
             return None
         
-        # 获取所有作品
-        works = self.processor.get_person_works(person_id)
-        all_works = []
-        for role_works in works.values():
-            all_works.extend(role_works)
-        
-        # 去重（同一作品可能有多重角色）
-        unique_works = {w['id']: w for w in all_works}.values()
+        # 获取所有作品（关联索引中已按ID去重，同一作品的多重角色合并为掩码）
+        index = self.processor.person_work_index
+        unique_works = [self.processor.get_node(w) for w in index.work_ids_of(person_id)]
+        works_by_role = index.role_count_map(person_id)
         
         # 统计基本信息
         total_works = len(unique_works)
@@ -61,7 +76,7 @@ class Task1_PersonEvaluation:
         # 统计时间跨度
         dates = []
         for work in unique_works:
-            date = self.processor.extract_date(work)
+            date = self.processor.get_year(work['id'])
             if date:
                 dates.append(date)
         
@@ -70,7 +85,7 @@ class Task1_PersonEvaluation:
         max_date = max(dates) if dates else None
         
         # 统计角色多样性
-        roles = set(works.keys())
+        roles = set(works_by_role)
         role_count = len(roles)
         
         # 统计流派分布
@@ -97,38 +112,21 @@ class Task1_PersonEvaluation:
             for g in self.all_genres
         }
         
-        # 统计影响力（被翻唱、采样等）
+        # 统计影响力（被翻唱、采样等），查整图一次算好的作品影响力
+        work_influence = self._work_influence()
         influence_score = 0
         for work in unique_works:
-            work_id = work['id']
-            # 被翻唱
-            covers = [e for e in self.processor.get_edges_to(work_id) if e[0] == 'CoverOf']
-            # 被采样
-            samples = [e for e in self.processor.get_edges_to(work_id) if e[0] == 'DirectlySamples']
-            # 被引用
-            references = [e for e in self.processor.get_edges_to(work_id) if e[0] in ['InterpolatesFrom', 'LyricalReferenceTo']]
-            # 被模仿
-            imitations = [e for e in self.processor.get_edges_to(work_id) if e[0] == 'InStyleOf']
-            
-            influence_score += len(covers) * 3 + len(samples) * 2 + len(references) + len(imitations)
+            influence_score += work_influence.get(work['id'], 0)
         
-        # 合作网络
-        collaborators = set()
-        for work in unique_works:
-            work_id = work['id']
-            for edge_type, source_id in self.processor.get_edges_to(work_id):
-                if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                    source_node = self.processor.get_node(source_id)
-                    if source_node and source_node.get('Node Type') == 'Person' and source_id != person_id:
-                        collaborators.add(source_id)
+        # 合作网络（共同署名矩阵的行非零数）
+        collaborators_count = self.processor.co_credit.count_of(person_id)
         
         # 唱片公司
         record_labels = set()
         for work in unique_works:
             work_id = work['id']
-            for edge_type, label_id in self.processor.get_edges_to(work_id):
-                if edge_type in ['RecordedBy', 'DistributedBy']:
-                    record_labels.add(label_id)
+            for edge_type, label_id in self.processor.get_edges_to(work_id, types=('RecordedBy', 'DistributedBy')):
+                record_labels.add(label_id)
         
         # 计算综合评分
         score = (
@@ -137,7 +135,7 @@ class Task1_PersonEvaluation:
             time_span * 0.1 +
             role_count * 5 * 0.1 +
             influence_score * 0.2 +
-            len(collaborators) * 0.1 +
+            collaborators_count * 0.1 +
             len(record_labels) * 0.1
         )
         
@@ -158,30 +156,93 @@ class Task1_PersonEvaluation:
             'genre_distribution': dict(genre_distribution),
             'genre_share': genre_share,  # 各流派占比（仅Song）
             'influence_score': influence_score,
-            'collaborators_count': len(collaborators),
+            'collaborators_count': collaborators_count,
             'record_labels_count': len(record_labels),
             'score': score,
-            'works_by_role': {role: len(works[role]) for role in roles}
+            'works_by_role': {role: works_by_role[role] for role in roles}
         }
     
-    def evaluate_all_persons(self):
-        """评估所有音乐人"""
+    def evaluate_all_persons(self, workers=None, chunk_size=500):
+        """评估所有音乐人
+        workers > 1 时按 chunk_size 分块交给进程池，各工作进程以只读 mmap 共享同一份索引
+        （graph_shared），结果按块顺序合并，与单进程结果一致；需要 backend='csr'
+        """
         print("\n正在评估所有音乐人...")
         persons = self.processor.get_nodes_by_type('Person')
-        results = []
+        person_ids = [person['id'] for person in persons]
+        if workers and workers > 1 and self.processor.csr is None:
+            print("[WARN] 多进程评估需要 backend='csr'，改为单进程")
+            workers = None
+        start = time.perf_counter()
         
-        for i, person in enumerate(persons):
-            if (i + 1) % 1000 == 0:
-                print(f"  已处理 {i+1}/{len(persons)} 个音乐人...")
+        def report(done):
+            rate = done / max(time.perf_counter() - start, 1e-9)
+            print(f"  已处理 {done}/{len(persons)} 个音乐人（{rate:.0f} 人/秒）...")
+        
+        results = []
+        if workers and workers > 1:
+            from graph_shared import shared_pool
             
-            evaluation = self.evaluate_person(person['id'])
-            if evaluation:
-                results.append(evaluation)
+            chunks = [person_ids[i:i + chunk_size] for i in range(0, len(person_ids), chunk_size)]
+            done = 0
+            with shared_pool(self.processor.publish_shared(), workers) as pool:
+                # imap 按提交顺序返回，保证结果顺序确定
+                for chunk, evaluations in zip(chunks, pool.imap(_evaluate_chunk, chunks)):
+                    results.extend(evaluations)
+                    done += len(chunk)
+                    report(done)
+        else:
+            for i, person_id in enumerate(person_ids):
+                if (i + 1) % 1000 == 0:
+                    report(i + 1)
+                
+                evaluation = self.evaluate_person(person_id)
+                if evaluation:
+                    results.append(evaluation)
         
         # 按评分排序
         results.sort(key=lambda x: x['score'], reverse=True)
         return results
 
+    def evaluate_batch(self, person_ids=None):
+        """批量评估（task1_batch.evaluate_persons），返回列式的 PersonEvaluationTable
+        table.to_records(sort=True) 与 evaluate_all_persons() 的结果完全一致
+        """
+        from task1_batch import evaluate_persons
+        
+        return evaluate_persons(self.processor, self.all_genres, person_ids, self.INFLUENCE_WEIGHTS)
+
+    def feature_table(self):
+        """综合评分的原始特征表 PersonFeatureTable（按图文件指纹缓存在 *.features/）"""
+        if self._features is None:
+            from task1_batch import PersonFeatureTable
+            self._features = PersonFeatureTable.load_or_build(
+                self.processor, self.all_genres, self.INFLUENCE_WEIGHTS)
+        return self._features
+
+    def rescore(self, weights=None, top_n=None):
+        """用新的评分权重给全部音乐人重新排名，不再遍历图
+        weights: {特征: 权重}（特征见 task1_batch.SCORE_FEATURES）、权重向量，或每行一组权重的矩阵
+        返回 [(person_id, score), ...]（按评分降序）；权重矩阵时每组权重各返回一个列表
+        """
+        from task1_batch import SCORE_WEIGHTS, weight_matrix
+
+        table = self.feature_table()
+        weights, single = weight_matrix(SCORE_WEIGHTS if weights is None else weights)
+        scores = table.scores(weights)      # (R, K)
+        results = []
+        for k, order in enumerate(table.ranking(weights)):
+            rows = order[:top_n]
+            results.append(list(zip(table.person_ids[rows].tolist(), scores[rows, k].tolist())))
+        return results[0] if single else results
+
+    def leaderboard(self):
+        """全部音乐人的评分排名 ScoreRanking（top_k / rank_of / page），reevaluate 时增量更新"""
+        if self._leaderboard is None:
+            from score_ranking import ScoreRanking
+            self._leaderboard = ScoreRanking.from_table(self.evaluate_batch())
+        return self._leaderboard
+
     def assign_genre_labels(self, evaluations, threshold: float = 0.4):
         """基于占比阈值为音乐人打流派标签（可多标签）。返回新列表副本。
         threshold: 占比阈值（0-1），如0.4表示>=40%则归为该流派。
@@ -200,64 +261,138 @@ class Task1_PersonEvaluation:
             labeled.append(item)
         return labeled
 
+    def genre_share_matrix(self, evaluations):
+        """由评估结果构造 音乐人×流派 占比矩阵（float64，列为 all_genres）"""
+        from person_genre_matrix import PersonGenreMatrix
+        return PersonGenreMatrix.from_evaluations(evaluations, self.all_genres)
+
+    def genre_label_sweep(self, evaluations, thresholds, fallback_top=True):
+        """多阈值流派标签（不复制评估字典），返回 GenreLabelSweep：每个阈值的标签位集及各流派人数
+        evaluations 可以是结果字典列表，也可以是 PersonGenreMatrix；单个阈值的标签与 assign_genre_labels 相同
+        """
+        from person_genre_matrix import PersonGenreMatrix
+        matrix = (evaluations if isinstance(evaluations, PersonGenreMatrix)
+                  else self.genre_share_matrix(evaluations))
+        return matrix.label_sweep(thresholds, fallback_top=fallback_top)
+
     def export_person_genre_matrix(self, evaluations, out_csv_path: str):
-        """导出人员×流派占比矩阵为CSV，第一列为person_id与name，后续26列为占比。"""
-        import csv
-        header = ['person_id', 'name'] + self.all_genres
-        with open(out_csv_path, 'w', encoding='utf-8', newline='') as f:
-            w = csv.writer(f)
-            w.writerow(header)
-            for ev in evaluations:
-                shares = ev.get('genre_share', {})
-                row = [ev.get('person_id'), ev.get('name')]
-                row.extend([shares.get(g, 0.0) for g in self.all_genres])
-                w.writerow(row)
-        return out_csv_path
+        """导出人员×流派占比矩阵为CSV，第一列为person_id与name，后续26列为占比。
+        evaluations 可以是结果字典列表，也可以是已构造好的 PersonGenreMatrix
+        """
+        from person_genre_matrix import PersonGenreMatrix
+        matrix = (evaluations if isinstance(evaluations, PersonGenreMatrix)
+                  else self.genre_share_matrix(evaluations))
+        return matrix.to_csv(out_csv_path)
+    
+    def affected_persons(self, changed):
+        """图增量更新后指标需要重算的音乐人
+        changed: processor.apply_delta 返回的受影响节点ID集合（增删改的节点及增删边的两端）
+        evaluate_person 的指标只依赖音乐人节点、其作品节点、作品上的角色边（合作者）
+        以及作品的影响类 / 唱片公司入边，因此受影响的是 changed 中的 Person
+        与 changed 中作品（更新后的图上）的全部 Person 参与者；
+        节点类型改变（如 Person 改为乐队）时 apply_delta 已把其作品计入 changed，
+        原来的合作者由此重算
+        """
+        persons = set()
+        for node_id in changed:
+            node = self.processor.get_node(node_id)
+            if node is not None and node.get('Node Type') == 'Person':
+                persons.add(node_id)
+        persons.update(self.processor.person_work_index.persons_of_works(changed, persons_only=True))
+        return persons
+
+    def reevaluate(self, evaluations, changed, threshold: float = 0.4):
+        """只重算受影响的音乐人，返回 (新的带标签评估列表, 重算的 person_id 集合)
+        evaluations: 更新前的带标签评估列表（如 person_evaluations_labeled.json 的内容）
+        结果与在更新后的图上重新评估全部音乐人并打标签相同（按评分降序，同分按节点顺序）；
+        流派集合变化时 genre_share 的列全部改变，退化为整体重算
+        """
+        self._influence = None
+        self._features = None
+        person_ids = [person['id'] for person in self.processor.get_nodes_by_type('Person')]
+        genres = self._collect_genres()
+        if genres != self.all_genres:
+            self.all_genres = genres
+            affected = set(person_ids)
+        else:
+            affected = self.affected_persons(changed)
+        
+        table = self.evaluate_batch([pid for pid in person_ids if pid in affected])
+        if self._leaderboard is not None:
+            current = set(person_ids)
+            self._leaderboard.remove([pid for pid in changed if pid not in current])
+            self._leaderboard.update(dict(zip(table.person_ids.tolist(), table.score.tolist())))
+        by_id = {ev['person_id']: ev for ev in evaluations}
+        for ev in self.assign_genre_labels(table.to_records(), threshold):
+            by_id[ev['person_id']] = ev
+        # 已删除的音乐人不在 person_ids 中，随之丢弃
+        records = [by_id[pid] for pid in person_ids if pid in by_id]
+        records.sort(key=lambda x: x['score'], reverse=True)
+        return records, affected
+
+    def patch_saved_results(self, changed, labeled_path='person_evaluations_labeled.json',
+                            matrix_path='person_genre_matrix.npy', threshold: float = 0.4):
+        """把增量重算的结果写回 person_evaluations_labeled.json 与占比矩阵，返回重算的 person_id 集合
+        矩阵只替换重算的行；矩阵不存在或与评估结果对不上时由评估结果整体重建
+        """
+        from pathlib import Path
+        from person_genre_matrix import PersonGenreMatrix
+        
+        with open(labeled_path, 'r', encoding='utf-8') as f:
+            evaluations = json.load(f)
+        records, affected = self.reevaluate(evaluations, changed, threshold)
+        with open(labeled_path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        
+        order = [ev['person_id'] for ev in records]
+        updates = self.genre_share_matrix([ev for ev in records if ev['person_id'] in affected])
+        matrix = None
+        if Path(matrix_path).exists():
+            matrix = PersonGenreMatrix.load(matrix_path, mmap=False)
+            if matrix.genres != updates.genres or any(
+                    pid not in matrix.row_of for pid in order if pid not in updates.row_of):
+                matrix = None
+        if matrix is None:
+            matrix = self.genre_share_matrix(records)
+        else:
+            matrix = matrix.patched(updates, order)
+        matrix.save(matrix_path)
+        return affected
     
     def get_person_works_grouped(self, person_id):
-        """获取音乐人的作品，按专辑分组"""
-        works = self.processor.get_person_works(person_id)
-        
-        # 获取所有作品
-        all_works = []
-        for role_works in works.values():
-            all_works.extend(role_works)
-        
-        # 按专辑分组
-        albums = {}
-        songs = []
-        
-        for work in all_works:
-            if work.get('Node Type') == 'Album':
-                albums[work['id']] = {
-                    'album': work,
-                    'songs': []
-                }
-            elif work.get('Node Type') == 'Song':
-                songs.append(work)
-        
-        # 为每个专辑找到相关的歌曲
-        for album_id, album_data in albums.items():
-            album_songs = self.processor.get_album_songs(album_id, person_id)
-            album_data['songs'] = album_songs
-        
-        # 未分组的歌曲
-        ungrouped_songs = []
-        for song in songs:
-            song_id = song['id']
-            # 检查是否已经分配给某个专辑
-            found = False
-            for album_data in albums.values():
-                if any(s['id'] == song_id for s in album_data['songs']):
-                    found = True
-                    break
-            if not found:
-                ungrouped_songs.append(song)
-        
-        return {
-            'albums': albums,
-            'ungrouped_songs': ungrouped_songs
-        }
+        """获取音乐人的作品，按专辑分组
+        已调用 get_all_person_works_grouped 时直接取缓存；否则只为该音乐人计算（未分组歌曲按集合判断）
+        """
+        processor = self.processor
+        index = processor.album_song_index
+        catalog = index.cached_catalog(person_id)
+        if catalog is None:
+            catalog = index.person_catalog(processor, processor.person_work_index, person_id, ROLE_EDGE_TYPES)
+        return processor._materialize_catalog(catalog)
+
+    def get_all_person_works_grouped(self):
+        """全部音乐人（角色边来源）的作品按专辑分组：ID -> get_person_works_grouped 的结果
+        一次遍历全图并缓存，之后 get_person_works_grouped 直接读缓存
+        """
+        return self.processor.get_all_person_works_grouped()
+
+
+_worker_task1 = None
+
+
+def _evaluate_chunk(person_ids):
+    """进程池任务：在工作进程中评估一块音乐人（每个进程只构造一次 Task1_PersonEvaluation）"""
+    global _worker_task1
+    if _worker_task1 is None:
+        from graph_shared import worker_processor
+        
+        _worker_task1 = Task1_PersonEvaluation(worker_processor())
+    results = []
+    for person_id in person_ids:
+        evaluation = _worker_task1.evaluate_person(person_id)
+        if evaluation:
+            results.append(evaluation)
+    return results
 
 
 class Task2_GenreAnalysis:
@@ -267,37 +402,10 @@ class Task2_GenreAnalysis:
         self.processor = processor
     
     def get_genre_timeline(self, genre=None):
-        """获取流派的时间线（按年份统计作品数）"""
-        genre_timeline = defaultdict(lambda: {'total': 0, 'notable': 0, 'songs': [], 'albums': []})
-        
-        # 获取所有Song和Album节点
-        songs = self.processor.get_nodes_by_type('Song')
-        albums = self.processor.get_nodes_by_type('Album')
-        
-        for work in songs + albums:
-            work_genre = work.get('genre')
-            if not work_genre:
-                continue
-            
-            if genre and work_genre != genre:
-                continue
-            
-            date = self.processor.extract_date(work, ['release_date'])
-            if not date:
-                continue
-            
-            genre_timeline[date]['total'] += 1
-            if work.get('notable'):
-                genre_timeline[date]['notable'] += 1
-            
-            if work.get('Node Type') == 'Song':
-                genre_timeline[date]['songs'].append(work)
-            else:
-                genre_timeline[date]['albums'].append(work)
-        
-        # 转换为排序的列表
-        timeline = sorted([(year, data) for year, data in genre_timeline.items()])
-        return timeline
+        """获取流派的时间线（按年份统计作品数）
+        读取处理器的流派×年份时间线立方体（整图只扫描一次），genre 为空时为全部流派
+        """
+        return self.processor.timeline_cube.timeline(genre)
     
     def get_cover_relationships(self, genre=None):
         """获取翻唱关系（按时间排序）"""
@@ -321,8 +429,8 @@ class Task2_GenreAnalysis:
                 if source.get('genre') != genre and target.get('genre') != genre:
                     continue
             
-            source_date = self.processor.extract_date(source, ['release_date'])
-            target_date = self.processor.extract_date(target, ['release_date'])
+            source_date = self.processor.get_year(source['id'], RELEASE_DATE_ONLY)
+            target_date = self.processor.get_year(target['id'], RELEASE_DATE_ONLY)
             
             if source_date and target_date:
                 covers.append({
@@ -368,13 +476,8 @@ class Task2_GenreAnalysis:
         }
     
     def get_all_genres(self):
-        """获取所有流派列表"""
-        genres = set()
-        for node in self.processor.get_nodes_by_type('Song') + self.processor.get_nodes_by_type('Album'):
-            genre = node.get('genre')
-            if genre:
-                genres.add(genre)
-        return sorted(list(genres))
+        """获取所有流派列表（Song / Album 中出现过的流派，排序）"""
+        return list(self.processor.timeline_cube.genres)
 
 
 class Task3_OceanusFolkPrediction:
@@ -383,6 +486,17 @@ class Task3_OceanusFolkPrediction:
     def __init__(self, processor):
         self.processor = processor
         self.target_genre = 'Oceanus Folk'
+        self._famous_of_persons = None
+        self._of_co_credit = None
+    
+    def _of_persons(self, notable=None):
+        """参与目标流派作品（任一角色）的 Person 集合：Person -[角色]-> Song/Album(目标流派)"""
+        result = self.processor.query(
+            Node('Person'),
+            Edge(ROLE_EDGE_TYPES),
+            Node(('Song', 'Album'), genre=self.target_genre, notable=notable),
+        ).run()
+        return set(result.column(0, unique=True).tolist())
     
     def extract_person_features(self, person_id):
         """提取音乐人的特征"""
@@ -390,15 +504,17 @@ class Task3_OceanusFolkPrediction:
         if not person:
             return None
         
-        # 获取所有作品
-        works = self.processor.get_person_works(person_id)
-        all_works = []
-        for role_works in works.values():
-            all_works.extend(role_works)
-        unique_works = {w['id']: w for w in all_works}.values()
-        
-        # 筛选Oceanus Folk作品
-        of_works = [w for w in unique_works if w.get('genre') == self.target_genre]
+        # 获取所有作品（关联索引中已按ID去重）
+        index = self.processor.person_work_index
+        work_ids, masks = index.works_with_masks(person_id)
+        of_works = []
+        of_mask = 0
+        for work_id, mask in zip(work_ids.tolist(), masks.tolist()):
+            work = self.processor.get_node(work_id)
+            # 筛选Oceanus Folk作品
+            if work.get('genre') == self.target_genre:
+                of_works.append(work)
+                of_mask |= mask
         
         if not of_works:
             return None
@@ -413,7 +529,7 @@ class Task3_OceanusFolkPrediction:
         recent_works = []
         of_dates = []
         for w in of_works:
-            date = self.processor.extract_date(w, ['release_date'])
+            date = self.processor.get_year(w['id'], RELEASE_DATE_ONLY)
             if date:
                 of_dates.append(date)
                 if 2035 <= date <= 2040:
@@ -437,11 +553,8 @@ class Task3_OceanusFolkPrediction:
         # 特征3：创新性
         original_count = 0
         for work in of_works:
-            work_id = work['id']
             # 检查是否是翻唱或采样
-            is_cover = any(e[0] == 'CoverOf' for e in self.processor.get_edges_from(work_id))
-            is_sample = any(e[0] == 'DirectlySamples' for e in self.processor.get_edges_from(work_id))
-            if not is_cover and not is_sample:
+            if not self.processor.get_degree(work['id'], ('CoverOf', 'DirectlySamples'), direction='out'):
                 original_count += 1
         
         originality_rate = original_count / of_total if of_total > 0 else 0
@@ -449,30 +562,22 @@ class Task3_OceanusFolkPrediction:
         # 被引用/模仿次数
         cited_count = 0
         for work in of_works:
-            work_id = work['id']
-            cited = len([e for e in self.processor.get_edges_to(work_id) 
-                        if e[0] in ['InterpolatesFrom', 'LyricalReferenceTo', 'InStyleOf']])
-            cited_count += cited
+            cited_count += self.processor.get_degree(
+                work['id'], ('InterpolatesFrom', 'LyricalReferenceTo', 'InStyleOf'))
         
         # 特征4：合作网络
-        # 找到已成名的OF音乐人
-        all_of_persons = set()
-        for work in self.processor.get_nodes_by_type('Song') + self.processor.get_nodes_by_type('Album'):
-            if work.get('genre') == self.target_genre and work.get('notable'):
-                for edge_type, source_id in self.processor.get_edges_to(work['id']):
-                    if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                        source_node = self.processor.get_node(source_id)
-                        if source_node and source_node.get('Node Type') == 'Person':
-                            all_of_persons.add(source_id)
-        
-        # 与该候选人的合作
-        collaborators = set()
-        for work in of_works:
-            work_id = work['id']
-            for edge_type, source_id in self.processor.get_edges_to(work_id):
-                if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                    if source_id != person_id:
-                        collaborators.add(source_id)
+        # 找到已成名的OF音乐人（与候选人无关，只算一次）
+        if self._famous_of_persons is None:
+            self._famous_of_persons = self._of_persons(notable=True)
+        all_of_persons = self._famous_of_persons
+        
+        # 与该候选人的合作（目标流派作品上的共同署名矩阵，只构建一次）
+        if self._of_co_credit is None:
+            from graph_cocredit import CoCreditMatrix
+            
+            of_work_ids = self.processor.columns.select(genre=self.target_genre).tolist()
+            self._of_co_credit = CoCreditMatrix.build(index, persons_only=False, work_ids=of_work_ids)
+        collaborators = self._of_co_credit.collaborators(person_id)
         
         # 与成名OF音乐人的合作
         famous_collaborators = collaborators & all_of_persons
@@ -482,17 +587,11 @@ class Task3_OceanusFolkPrediction:
         record_labels = set()
         for work in of_works:
             work_id = work['id']
-            for edge_type, label_id in self.processor.get_edges_to(work_id):
-                if edge_type in ['RecordedBy', 'DistributedBy']:
-                    record_labels.add(label_id)
+            for edge_type, label_id in self.processor.get_edges_to(work_id, types=('RecordedBy', 'DistributedBy')):
+                record_labels.add(label_id)
         
         # 特征6：角色多样性
-        of_roles = set()
-        for edge_type, target_id in self.processor.get_edges_from(person_id):
-            if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                target = self.processor.get_node(target_id)
-                if target and target.get('genre') == self.target_genre:
-                    of_roles.add(edge_type)
+        of_roles = index.roles_of(person_id, of_mask)
         
         role_count = len(of_roles)
         
@@ -566,14 +665,7 @@ class Task3_OceanusFolkPrediction:
         print(f"\n正在分析Oceanus Folk音乐人...")
         
         # 找到所有有OF作品的人
-        of_persons = set()
-        for work in self.processor.get_nodes_by_type('Song') + self.processor.get_nodes_by_type('Album'):
-            if work.get('genre') == self.target_genre:
-                for edge_type, source_id in self.processor.get_edges_to(work['id']):
-                    if edge_type in ['PerformerOf', 'ComposerOf', 'LyricistOf', 'ProducerOf']:
-                        source_node = self.processor.get_node(source_id)
-                        if source_node and source_node.get('Node Type') == 'Person':
-                            of_persons.add(source_id)
+        of_persons = self._of_persons()
         
         print(f"  找到 {len(of_persons)} 个有Oceanus Folk作品的音乐人")
         
@@ -584,10 +676,9 @@ class Task3_OceanusFolkPrediction:
             if features:
                 candidates.append(features)
         
-        # 按评分排序
-        candidates.sort(key=lambda x: x['score'], reverse=True)
-        
-        return candidates[:top_n]
+        # 按评分取前 top_n（堆选择，与整体排序后截取相同）
+        from score_ranking import top_k_records
+        return top_k_records(candidates, top_n)
 
 
 if __name__ == '__main__':
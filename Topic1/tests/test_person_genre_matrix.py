@@ -0,0 +1,130 @@
+"""The share-matrix paths must reproduce the JSON / dict paths exactly."""
+from __future__ import annotations
+
+import csv
+import dataclasses
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from person_genre_matrix import PersonGenreMatrix
+from task_analysis import Task1_PersonEvaluation
+
+GENRES = ["A", "B", "C", "D"]
+
+# (person_id, score, work counts per genre); shares are count / total as in evaluate_person
+PERSONS = [
+    (1, 10.0, {"A": 6, "B": 3, "C": 6, "D": 5}),    # 6/20 vs 3/20: spread exactly 0.15
+    (2, 10.0, {"A": 9, "B": 6, "C": 5}),            # 9/20 vs 6/20: spread just above 0.15
+    (3, 8.5, {"A": 3, "B": 2}),                     # dominant share exactly 0.6
+    (4, 8.5, {"A": 1, "B": 1, "C": 1}),             # 1/3 each
+    (5, 7.0, {"B": 7, "D": 3}),                     # 0.7 / 0.3
+    (6, 7.0, {"C": 2, "D": 3}),                     # 0.4 / 0.6
+    (7, 1.0, {}),                                   # no genre at all
+]
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name, PROJECT_ROOT / "scripts" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def evaluations():
+    records = []
+    for person_id, score, counts in PERSONS:
+        total = sum(counts.values())
+        records.append({
+            "person_id": person_id,
+            "name": f"Person {person_id}",
+            "stage_name": None,
+            "score": score,
+            "genre_distribution": dict(counts),
+            "genre_share": {g: counts.get(g, 0) / total if total > 0 else 0.0 for g in GENRES},
+        })
+    return records
+
+
+@pytest.fixture
+def saved_matrix(tmp_path):
+    """Matrix written and read back the way save_results.py and the scripts do"""
+    path = PersonGenreMatrix.from_evaluations(evaluations(), GENRES).save(tmp_path / "matrix.npy")
+    return PersonGenreMatrix.load(path)
+
+
+@pytest.mark.parametrize("min_genres, max_spread, max_dominant", [
+    (2, 0.15, 0.6),
+    (2, 0.2, 0.6),
+    (2, 0.5, 0.6),
+    (3, 0.15, 0.35),
+])
+def test_uniformity_matrix_matches_json(saved_matrix, min_genres, max_spread, max_dominant):
+    script = load_script("analyze_genre_uniformity")
+    expected = script.find_uniform_persons(evaluations(), min_genres, max_spread, max_dominant)
+    got = script.find_uniform_persons_matrix(saved_matrix, min_genres, max_spread, max_dominant)
+    assert [dataclasses.asdict(s) for s in got] == [dataclasses.asdict(s) for s in expected]
+
+
+def test_uniformity_boundary_shares(saved_matrix):
+    script = load_script("analyze_genre_uniformity")
+    got = script.find_uniform_persons_matrix(saved_matrix, 2, 0.15, 0.6)
+    selected = {s.person_id for s in got}
+    assert 1 in selected
+    assert 2 not in selected
+
+
+def test_visualization_matrix_matches_json(saved_matrix, tmp_path, monkeypatch):
+    script = load_script("rebuild_visualization_data")
+    source = tmp_path / "person_evaluations_labeled.json"
+    source.write_text(json.dumps(evaluations()), encoding="utf-8")
+    monkeypatch.setattr(script, "PERSON_SOURCE", source)
+
+    expected = script.build_visualization_payload(GENRES, script.collect_artists_by_genre(GENRES))
+    got = script.build_visualization_payload(GENRES, script.collect_artists_from_matrix(saved_matrix, GENRES))
+    assert json.dumps(got, indent=2) == json.dumps(expected, indent=2)
+    shares = [a["genre_share"] for a in got["genres_data"]["D"]["artists"]]
+    assert 0.3 in shares and 0.6 in shares
+
+
+def test_export_csv_matches_row_writer(tmp_path):
+    task1 = Task1_PersonEvaluation.__new__(Task1_PersonEvaluation)
+    task1.all_genres = GENRES
+    records = evaluations()
+    got = task1.export_person_genre_matrix(records, tmp_path / "matrix.csv")
+
+    # The original export: one row per person, written from the genre_share dict
+    expected = tmp_path / "expected.csv"
+    with open(expected, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["person_id", "name"] + GENRES)
+        for ev in records:
+            shares = ev.get("genre_share", {})
+            w.writerow([ev.get("person_id"), ev.get("name")] + [shares.get(g, 0.0) for g in GENRES])
+    assert Path(got).read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("shares", [
+    None,
+    [{"A": 0.3333333333, "B": 0.6666666667}],
+])
+def test_label_sweep_matches_assign_genre_labels(tmp_path, shares):
+    task1 = Task1_PersonEvaluation.__new__(Task1_PersonEvaluation)
+    task1.all_genres = GENRES
+    records = evaluations() if shares is None else [
+        {"person_id": i, "genre_share": share} for i, share in enumerate(shares)]
+    thresholds = [0.15, 0.3, 1 / 3, 0.4, 0.6, 0.7, 1.0]
+    path = PersonGenreMatrix.from_evaluations(records, GENRES).save(tmp_path / "matrix.npy")
+    sweep = PersonGenreMatrix.load(path).label_sweep(thresholds)
+    for threshold in thresholds:
+        for ev in task1.assign_genre_labels(records, threshold):
+            expected = [g for g in GENRES if g in ev["genre_labels"]]
+            assert sweep.labels(threshold, ev["person_id"]) == expected